@@ -0,0 +1,83 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Synthetic ballot profiles for benchmarking. Every generator returns a list
+# of {"count", "ballot"} dictionaries holding complete orderings of the
+# candidates, most preferred first, and is reproducible given a seed.
+import math
+import random
+
+
+def candidate_names(candidates):
+    return ["c%0*d" % (len(str(candidates - 1)), i) for i in range(candidates)]
+
+
+# Every voter draws an ordering uniformly at random
+def impartial_culture(candidates, voters, seed=None):
+    generator = random.Random(seed)
+    names = candidate_names(candidates)
+    ballots = []
+    for voter in range(voters):
+        ballot = names[:]
+        generator.shuffle(ballot)
+        ballots.append({"count": 1, "ballot": ballot})
+    return ballots
+
+
+# Voters draw orderings near a reference ordering, each ordering being
+# dispersion^d times as likely as the reference, where d is the number of
+# pairs it swaps. Orderings are sampled through the repeated insertion model.
+def mallows(candidates, voters, dispersion=0.5, reference=None, seed=None):
+    generator = random.Random(seed)
+    reference = list(reference or candidate_names(candidates))
+    insertion_weights = [
+        [dispersion ** (i - j) for j in range(i + 1)]
+        for i in range(len(reference))
+    ]
+    ballots = []
+    for voter in range(voters):
+        ballot = []
+        for i, candidate in enumerate(reference):
+            position = generator.choices(range(i + 1), weights=insertion_weights[i])[0]
+            ballot.insert(position, candidate)
+        ballots.append({"count": 1, "ballot": ballot})
+    return ballots
+
+
+# Polya-Eggenberger urn: each voter draws an ordering from an urn initially
+# holding every ordering once, then returns it along with replacements more
+# copies of it, so popular orderings become more popular
+def urn(candidates, voters, replacements=1, seed=None):
+    generator = random.Random(seed)
+    names = candidate_names(candidates)
+    orderings = math.factorial(candidates)
+    drawn = []
+    ballots = []
+    for voter in range(voters):
+        if generator.random() * (orderings + replacements * len(drawn)) < orderings:
+            ballot = names[:]
+            generator.shuffle(ballot)
+        else:
+            ballot = list(generator.choice(drawn))
+        drawn.append(ballot)
+        ballots.append({"count": 1, "ballot": ballot})
+    return ballots
+
+
+MODELS = {
+    "impartial_culture": impartial_culture,
+    "mallows": mallows,
+    "urn": urn,
+}
@@ -0,0 +1,263 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Runs every voting system over a grid of synthetic profiles, recording the
+# time and peak memory each one takes, and compares the results against a
+# stored baseline. Run "python -m benchmarks.run --help" for the options.
+from .generators import MODELS
+from py3votecore.plurality import Plurality
+from py3votecore.borda import Borda
+from py3votecore.irv import IRV
+from py3votecore.stv import STV
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.ranked_pairs import RankedPairs
+from py3votecore.schulze_stv import SchulzeSTV
+from py3votecore.schulze_pr import SchulzePR
+from py3votecore.schulze_npr import SchulzeNPR
+from py3votecore.borda_manipulation_heurestics_methods import AverageFit, LargestFit
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+GROUPING = SchulzeMethod.BALLOT_NOTATION_GROUPING
+
+# Results slower than the baseline by more than this factor are regressions
+DEFAULT_TOLERANCE = 1.5
+
+# Timings below this many seconds are too noisy to compare
+MINIMUM_SECONDS = 0.005
+
+
+def grouped(ballots):
+    return [{"count": ballot["count"], "ballot": [[candidate] for candidate in ballot["ballot"]]} for ballot in ballots]
+
+
+# Each system is run as system(ballots, seats), and is skipped for profiles
+# with more candidates than its limit
+SYSTEMS = {
+    "Plurality": (lambda ballots, seats: Plurality([{"count": ballot["count"], "ballot": ballot["ballot"][0]} for ballot in ballots]), None),
+    "Borda": (lambda ballots, seats: Borda(ballots), None),
+    "IRV": (lambda ballots, seats: IRV(ballots), None),
+    "STV": (lambda ballots, seats: STV(ballots, required_winners=seats), None),
+    "SchulzeMethod": (lambda ballots, seats: SchulzeMethod(grouped(ballots), ballot_notation=GROUPING), None),
+    "RankedPairs": (lambda ballots, seats: RankedPairs(grouped(ballots), ballot_notation=GROUPING), None),
+    "SchulzeSTV": (lambda ballots, seats: SchulzeSTV(grouped(ballots), required_winners=seats, ballot_notation=GROUPING), 8),
+    "SchulzeSTV (pruned)": (lambda ballots, seats: SchulzeSTV(grouped(ballots), required_winners=seats, ballot_notation=GROUPING, pruned=True), 10),
+    "SchulzePR": (lambda ballots, seats: SchulzePR(grouped(ballots), winner_threshold=seats, ballot_notation=GROUPING), 8),
+    "SchulzeNPR": (lambda ballots, seats: SchulzeNPR(grouped(ballots), ballot_notation=GROUPING), None),
+    "AverageFit": (lambda ballots, seats: AverageFit(ballots, ballots[0]["ballot"][-1], seats), 8),
+    "LargestFit": (lambda ballots, seats: LargestFit(ballots, ballots[0]["ballot"][-1], seats), 8),
+}
+
+DEFAULT_GRID = {
+    "models": ["impartial_culture", "mallows", "urn"],
+    "candidates": [4, 6, 8],
+    "seats": [2],
+    "voters": [100, 1000, 10000],
+}
+
+QUICK_GRID = {
+    "models": ["impartial_culture", "mallows", "urn"],
+    "candidates": [4],
+    "seats": [2],
+    "voters": [50],
+}
+
+
+# Seconds each module may take to import in a fresh interpreter. Systems that
+# don't need NumPy or networkx must not load them.
+IMPORT_BUDGETS = {
+    "py3votecore": 0.025,
+    "py3votecore.plurality": 0.025,
+    "py3votecore.plurality_at_large": 0.025,
+    "py3votecore.borda": 0.025,
+    "py3votecore.irv": 0.025,
+    "py3votecore.stv": 0.025,
+    "py3votecore.borda_manipulation_heurestics_methods": 0.025,
+    "py3votecore.schulze_method": 0.25,
+    "py3votecore.schulze_stv": 0.25,
+}
+
+IMPORT_SCRIPT = "import time; start = time.perf_counter(); import %s; print(time.perf_counter() - start)"
+
+
+# Times importing each module (the best of repeat runs), each in a new
+# interpreter so nothing is already loaded
+def import_times(budgets=IMPORT_BUDGETS, repeat=3):
+    results = []
+    for module, budget in budgets.items():
+        seconds = min(
+            float(subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT % module]))
+            for i in range(repeat)
+        )
+        results.append({"module": module, "seconds": seconds, "budget": budget})
+    return results
+
+
+def over_budget(imports):
+    return [result for result in imports if result["seconds"] > result["budget"]]
+
+
+# Times a single run (the best of repeat runs) and measures its peak memory
+# in a separate run, since tracing allocations slows everything down
+def measure(run, repeat=1):
+    seconds = math.inf
+    for i in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def case_key(result):
+    return (result["system"], result["model"], result["candidates"], result["seats"], result["voters"])
+
+
+def run_suite(grid=DEFAULT_GRID, systems=None, repeat=1, seed=0, log=None):
+    results = []
+    for model in grid["models"]:
+        for candidates in grid["candidates"]:
+            for voters in grid["voters"]:
+                ballots = MODELS[model](candidates, voters, seed=seed)
+                for seats in grid["seats"]:
+                    if seats >= candidates:
+                        continue
+                    for name in systems or SYSTEMS:
+                        system, limit = SYSTEMS[name]
+                        if limit is not None and candidates > limit:
+                            continue
+                        seconds, peak = measure(lambda: system(ballots, seats), repeat)
+                        results.append({
+                            "system": name,
+                            "model": model,
+                            "candidates": candidates,
+                            "seats": seats,
+                            "voters": voters,
+                            "seconds": seconds,
+                            "peak_bytes": peak,
+                        })
+                        if log is not None:
+                            log("%-20s %-18s C=%-3d W=%-2d V=%-7d %9.4fs %8.1f KiB" % (name, model, candidates, seats, voters, seconds, peak / 1024.0))
+    return results
+
+
+# Fits seconds ~ voters^k for each system, model, candidate and seat count,
+# giving the exponent k of how each system scales with the electorate
+def scaling(results):
+    curves = {}
+    for result in results:
+        key = "%s/%s/C=%d/W=%d" % (result["system"], result["model"], result["candidates"], result["seats"])
+        curves.setdefault(key, []).append((result["voters"], result["seconds"]))
+    exponents = {}
+    for key, points in curves.items():
+        points = [(math.log(voters), math.log(seconds)) for voters, seconds in points if seconds > 0]
+        if len(points) < 2:
+            continue
+        mean_x = sum(x for x, y in points) / len(points)
+        mean_y = sum(y for x, y in points) / len(points)
+        spread = sum((x - mean_x) ** 2 for x, y in points)
+        if spread > 0:
+            exponents[key] = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+    return exponents
+
+
+# Lists the cases that got slower than the baseline by more than the
+# tolerance, or use more peak memory by the same factor
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    previous = dict((case_key(result), result) for result in baseline["results"])
+    regressions = []
+    for result in results:
+        before = previous.get(case_key(result))
+        if before is None:
+            continue
+        for measurement, floor in (("seconds", MINIMUM_SECONDS), ("peak_bytes", 0)):
+            if result[measurement] > max(before[measurement], floor) * tolerance:
+                regressions.append({
+                    "case": dict(zip(("system", "model", "candidates", "seats", "voters"), case_key(result))),
+                    "measurement": measurement,
+                    "baseline": before[measurement],
+                    "current": result[measurement],
+                    "ratio": result[measurement] / before[measurement] if before[measurement] else math.inf,
+                })
+    return regressions
+
+
+def report(results, imports=None):
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "scaling": scaling(results),
+    }
+    if imports is not None:
+        data["imports"] = imports
+    return data
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark the voting systems over synthetic ballot profiles")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="slowdown factor counted as a regression")
+    parser.add_argument("--quick", action="store_true", help="run a small grid, as a smoke test")
+    parser.add_argument("--system", action="append", choices=sorted(SYSTEMS), help="only run these systems")
+    parser.add_argument("--model", action="append", choices=sorted(MODELS), help="only use these profile models")
+    parser.add_argument("--candidates", type=int, action="append", help="candidate counts to run")
+    parser.add_argument("--seats", type=int, action="append", help="seat counts to run")
+    parser.add_argument("--voters", type=int, action="append", help="voter counts to run")
+    parser.add_argument("--repeat", type=int, default=1, help="time the best of this many runs")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(arguments)
+
+    grid = dict(QUICK_GRID if options.quick else DEFAULT_GRID)
+    for dimension, values in (("models", options.model), ("candidates", options.candidates), ("seats", options.seats), ("voters", options.voters)):
+        if values:
+            grid[dimension] = values
+
+    imports = import_times()
+    for result in imports:
+        print("import %(module)-50s %(seconds)9.4fs (budget %(budget)ss)" % result)
+    results = run_suite(grid, options.system, options.repeat, options.seed, log=print)
+    data = report(results, imports)
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(data, output, indent=2, sort_keys=True)
+
+    slow_imports = over_budget(imports)
+    for result in slow_imports:
+        print("OVER BUDGET import %(module)s: %(seconds).4fs > %(budget)ss" % result)
+
+    regressions = []
+    if options.baseline:
+        with open(options.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), options.tolerance)
+        for regression in regressions:
+            print("REGRESSION %(case)s %(measurement)s: %(baseline)s -> %(current)s (x%(ratio).2f)" % regression)
+    return 1 if regressions or slow_imports else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
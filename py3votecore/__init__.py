@@ -0,0 +1,60 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# The voting systems can be imported from here, as in
+# "from py3votecore import SchulzeSTV". Each is only imported when first
+# used, so a tally only pays for the modules (and dependencies) it needs.
+import importlib
+
+_MODULES = {
+    "Plurality": "plurality",
+    "PluralityAtLarge": "plurality_at_large",
+    "Borda": "borda",
+    "BordaAtLarge": "borda_at_large",
+    "IRV": "irv",
+    "STV": "stv",
+    "SchulzeMethod": "schulze_method",
+    "SchulzeSTV": "schulze_stv",
+    "SchulzePR": "schulze_pr",
+    "SchulzeNPR": "schulze_npr",
+    "SchulzeMethodByGraph": "schulze_by_graph",
+    "SchulzeNPRByGraph": "schulze_by_graph",
+    "RankedPairs": "ranked_pairs",
+    "RankedPairsByGraph": "ranked_pairs",
+    "AverageFit": "borda_manipulation_heurestics_methods",
+    "LargestFit": "borda_manipulation_heurestics_methods",
+    "BallotProfile": "ballot_profile",
+    "BallotStream": "streaming",
+    "CondorcetTally": "live",
+    "PluralityTally": "live",
+    "BordaTally": "live",
+    "TieBreaker": "tie_breaker",
+    "run_batch": "batch",
+    "ResultCache": "cache",
+}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + _MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -14,23 +14,47 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .tie_breaker import TieBreaker
+from .ballot_profile import BallotProfile
+from .common_functions import aggregate_ballots
+from .instrumentation import InstrumentedMeta, phase, record
 from abc import ABCMeta, abstractmethod
-from copy import copy, deepcopy
+from copy import copy
 import types
 
 
 # This class provides methods that most electoral systems make use of.
-class VotingSystem(object, metaclass=ABCMeta):
+class VotingSystem(object, metaclass=InstrumentedMeta):
+
+    # The attributes a count sets, any of which runs a deferred count when
+    # first read. Other missing attributes raise as usual.
+    LAZY_RESULTS = ("candidates",)
+
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None):
-        self.ballots = ballots
-        for ballot in self.ballots:
-            if "count" not in ballot:
-                ballot["count"] = 1
+        with phase("standardize_ballots"):
+
+            # Systems counting ballot lists (STV, IRV, Borda, Plurality) turn
+            # a profile back into ballots. Condorcet systems keep the profile
+            # itself and pass no ballots here.
+            if isinstance(ballots, BallotProfile):
+                ballots = list(ballots.as_ballots())
+            self.ballots = aggregate_ballots(ballots)
         self.tie_breaker = tie_breaker
         if isinstance(self.tie_breaker, list):
             self.tie_breaker = TieBreaker(self.tie_breaker)
-        self.calculate_results()
+
+        # Systems built with lazy=True defer the whole count, diagnostics
+        # included, until a result is first asked for
+        if self.__dict__.get("lazy"):
+            self.pending = True
+        else:
+            self.calculate_results()
+
+    def __getattr__(self, name):
+        if name in type(self).LAZY_RESULTS and self.__dict__.pop("pending", False):
+            record(self.calculate_results, self)
+            return getattr(self, name)
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
 
     @abstractmethod
     def as_dict(self):
@@ -38,6 +62,8 @@ class VotingSystem(object, metaclass=ABCMeta):
         data["candidates"] = self.candidates
         if self.tie_breaker and self.tie_breaker.ties_broken:
             data["tie_breaker"] = self.tie_breaker.as_list()
+        if hasattr(self, 'timings'):
+            data["timings"] = self.timings
         return data
 
     def break_ties(self, tied_objects, reverse_order=False):
@@ -48,6 +74,8 @@ class VotingSystem(object, metaclass=ABCMeta):
 
 # Given a set of candidates, return a fixed number of winners
 class FixedWinnerVotingSystem(VotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = VotingSystem.LAZY_RESULTS + ("tied_winners",)
+
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None):
         super(FixedWinnerVotingSystem, self).__init__(ballots, tie_breaker)
@@ -61,6 +89,8 @@ class FixedWinnerVotingSystem(VotingSystem, metaclass=ABCMeta):
 
 # Given a set of candidates, return the set of winners
 class MultipleWinnerVotingSystem(FixedWinnerVotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = FixedWinnerVotingSystem.LAZY_RESULTS + ("winners",)
+
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None, required_winners=1):
         self.required_winners = required_winners
@@ -78,6 +108,8 @@ class MultipleWinnerVotingSystem(FixedWinnerVotingSystem, metaclass=ABCMeta):
 
 # Given a set of candidates, return a single winners
 class SingleWinnerVotingSystem(FixedWinnerVotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = FixedWinnerVotingSystem.LAZY_RESULTS + ("winner",)
+
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None):
         super(SingleWinnerVotingSystem, self).__init__(ballots, tie_breaker)
@@ -90,6 +122,8 @@ class SingleWinnerVotingSystem(FixedWinnerVotingSystem, metaclass=ABCMeta):
 
 # Given a set of candidates, return a fixed number of winners
 class AbstractSingleWinnerVotingSystem(SingleWinnerVotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = SingleWinnerVotingSystem.LAZY_RESULTS + ("multiple_winner_instance",)
+
     @abstractmethod
     def __init__(self, ballots, multiple_winner_class, tie_breaker=None):
         self.multiple_winner_class = multiple_winner_class
@@ -97,7 +131,8 @@ class AbstractSingleWinnerVotingSystem(SingleWinnerVotingSystem, metaclass=ABCMe
 
     def calculate_results(self):
         self.multiple_winner_instance = self.multiple_winner_class(self.ballots, tie_breaker=self.tie_breaker, required_winners=1)
-        self.__dict__.update(self.multiple_winner_instance.__dict__)
+        # The inner system's timings are already part of this system's own
+        self.__dict__.update((name, value) for name, value in self.multiple_winner_instance.__dict__.items() if name != "timings")
         self.winner = list(self.winners)[0]
         del self.winners
 
@@ -105,11 +140,15 @@ class AbstractSingleWinnerVotingSystem(SingleWinnerVotingSystem, metaclass=ABCMe
         data = super(AbstractSingleWinnerVotingSystem, self).as_dict()
         data.update(self.multiple_winner_instance.as_dict())
         del data["winners"]
+        if hasattr(self, 'timings'):
+            data["timings"] = self.timings
         return data
 
 
 # Given a set of candidates, return an ordering
 class OrderingVotingSystem(VotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = VotingSystem.LAZY_RESULTS + ("order",)
+
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None, winner_threshold=None):
         self.winner_threshold = winner_threshold
@@ -125,6 +164,8 @@ class OrderingVotingSystem(VotingSystem, metaclass=ABCMeta):
 # sequentially removing the winner and rerunning the election with the
 # smaller subset of candidates until all candidates are consumed.
 class AbstractOrderingVotingSystem(OrderingVotingSystem, metaclass=ABCMeta):
+    LAZY_RESULTS = OrderingVotingSystem.LAZY_RESULTS + ("rounds",)
+
     @abstractmethod
     def __init__(self, ballots, single_winner_class, winner_threshold=None, tie_breaker=None):
         self.single_winner_class = single_winner_class
@@ -133,15 +174,17 @@ class AbstractOrderingVotingSystem(OrderingVotingSystem, metaclass=ABCMeta):
     def calculate_results(self):
         self.order = []
         self.rounds = []
-        remaining_ballots = deepcopy(self.ballots)
+        remaining_ballots = self.ballots
         remaining_candidates = True
         while (
             (remaining_candidates is True or len(remaining_candidates) > 1)
             and (self.winner_threshold is None or len(self.order) < self.winner_threshold)
         ):
 
-            # Given the remaining ballots, who should win?
-            result = self.single_winner_class(deepcopy(remaining_ballots), tie_breaker=self.tie_breaker)
+            # Given the remaining ballots, who should win? The single winner
+            # class works on its own normalized copy of the ballots, which we
+            # then trim for the next round.
+            result = self.single_winner_class(remaining_ballots, tie_breaker=self.tie_breaker)
 
             # Mark the candidate that won
             r = {'winner': result.winner}
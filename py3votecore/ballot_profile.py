@@ -0,0 +1,169 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+BALLOT_NOTATION_GROUPING = 0
+BALLOT_NOTATION_RANKING = 1
+BALLOT_NOTATION_RATING = 2
+BALLOT_NOTATION_ORDERING = 3
+
+# Ranks are stored as 16-bit integers, with the largest one left for unranked
+# candidates. NumPy is only imported once a profile is built, so the systems
+# that never build one don't pay for it.
+RANK_DTYPE = "int16"
+UNRANKED = 32767
+
+# Upper bound on the number of ballot x candidate x candidate comparisons held
+# in memory at once while building a pairwise matrix
+PAIRWISE_CHUNK_CELLS = 1 << 22
+
+
+# This class stores a set of ballots as a matrix of integer ranks (one row per
+# ballot, one column per candidate) alongside a vector of ballot counts. Lower
+# ranks are preferred, equal ranks are ties and candidates left off a ballot
+# all share the UNRANKED rank below every ranked candidate.
+class BallotProfile(object):
+
+    def __init__(self, candidates, ranks, counts):
+        import numpy
+        self.candidates = tuple(candidates)
+        if len(self.candidates) >= UNRANKED:
+            raise Exception("Too many candidates for a ballot profile")
+        self.index = dict((candidate, i) for i, candidate in enumerate(self.candidates))
+        self.ranks = numpy.array(ranks, dtype=RANK_DTYPE).reshape(-1, len(self.candidates))
+        self.counts = numpy.array(counts)
+        if self.counts.dtype.kind not in "iuf":
+            self.counts = self.counts.astype(numpy.float64)
+        if len(self.counts) != len(self.ranks):
+            raise Exception("Ballot counts do not match the ranks provided")
+
+        # Profiles are shared between voting systems, so they must not change
+        self.ranks.flags.writeable = False
+        self.counts.flags.writeable = False
+
+    def __len__(self):
+        return len(self.ranks)
+
+    # Builds a profile out of the {"count", "ballot"} dictionaries accepted by
+    # the voting systems. Without a notation, dictionary ballots are read as
+    # ratings and anything else as an ordering of candidates. Identical ballots
+    # are merged into a single row as they are read.
+    @classmethod
+    def from_ballots(cls, ballots, ballot_notation=None, candidates=None):
+        candidates = list(candidates or [])
+        index = dict((candidate, i) for i, candidate in enumerate(candidates))
+        rows, counts, seen = [], [], {}
+        for ballot in ballots:
+            ranks = cls.ballot_ranks(ballot["ballot"], ballot_notation)
+            key = frozenset(ranks.items())
+            if key in seen:
+                counts[seen[key]] += ballot.get("count", 1)
+                continue
+            for candidate in ranks:
+                if candidate not in index:
+                    index[candidate] = len(candidates)
+                    candidates.append(candidate)
+            seen[key] = len(rows)
+            rows.append(ranks)
+            counts.append(ballot.get("count", 1))
+
+        import numpy
+        matrix = numpy.full((len(rows), len(candidates)), UNRANKED, dtype=RANK_DTYPE)
+        for row, ranks in zip(matrix, rows):
+            for candidate, rank in ranks.items():
+                row[index[candidate]] = rank
+        return cls(candidates, matrix, counts)
+
+    # Returns a profile in which identical rows have been merged, keeping the
+    # rows in the order they first appeared
+    def aggregate(self):
+        import numpy
+        rows, first, inverse = numpy.unique(self.ranks, axis=0, return_index=True, return_inverse=True)
+        counts = numpy.zeros(len(rows), dtype=self.counts.dtype)
+        numpy.add.at(counts, inverse.reshape(-1), self.counts)
+        order = numpy.argsort(first)
+        return BallotProfile(self.candidates, rows[order], counts[order])
+
+    # Returns the matrix d where d[i][j] is the number of voters strictly
+    # preferring candidate i to candidate j. Ballots are compared in chunks so
+    # every candidate pair is handled by a single batched operation.
+    def pairwise_matrix(self):
+        import numpy
+        candidate_count = len(self.candidates)
+        matrix = numpy.zeros((candidate_count, candidate_count), dtype=self.counts.dtype)
+        chunk = max(1, PAIRWISE_CHUNK_CELLS // max(1, candidate_count * candidate_count))
+        for start in range(0, len(self.ranks), chunk):
+            ranks = self.ranks[start:start + chunk]
+            preferred = ranks[:, :, numpy.newaxis] < ranks[:, numpy.newaxis, :]
+            matrix += numpy.tensordot(self.counts[start:start + chunk], preferred, axes=1).astype(matrix.dtype)
+        return matrix
+
+    # Converts a single ballot into a dictionary of dense ranks starting at 0
+    @staticmethod
+    def ballot_ranks(ballot, ballot_notation=None):
+        if ballot_notation is None:
+            ballot_notation = BALLOT_NOTATION_RATING if isinstance(ballot, dict) else BALLOT_NOTATION_ORDERING
+
+        if ballot_notation == BALLOT_NOTATION_GROUPING:
+            ranks = {}
+            for rank, group in enumerate(ballot):
+                for candidate in group:
+                    ranks[candidate] = rank
+            return ranks
+        elif ballot_notation == BALLOT_NOTATION_ORDERING:
+            if not isinstance(ballot, (list, tuple)):
+                ballot = [ballot]
+            return dict(zip(ballot, range(len(ballot))))
+        elif ballot_notation in (BALLOT_NOTATION_RANKING, BALLOT_NOTATION_RATING):
+            values = sorted(set(float(value) for value in ballot.values()), reverse=(ballot_notation == BALLOT_NOTATION_RATING))
+            dense = dict((value, rank) for rank, value in enumerate(values))
+            return dict((candidate, dense[float(value)]) for candidate, value in ballot.items())
+        else:
+            raise Exception("Unknown notation specified", ballot_notation)
+
+    # Returns the ranked candidates of a row, grouped by rank from most to
+    # least preferred
+    def groups(self, row):
+        ranks = self.ranks[row]
+        ranked = sorted(
+            (int(rank), i)
+            for i, rank in enumerate(ranks)
+            if rank != UNRANKED
+        )
+        groups = []
+        last_rank = None
+        for rank, i in ranked:
+            if rank != last_rank:
+                groups.append([])
+                last_rank = rank
+            groups[-1].append(self.candidates[i])
+        return groups
+
+    # Converts the profile back into ballot dictionaries, one row at a time
+    def as_ballots(self, ballot_notation=BALLOT_NOTATION_ORDERING):
+        for row, count in enumerate(self.counts.tolist()):
+            groups = self.groups(row)
+            if ballot_notation == BALLOT_NOTATION_ORDERING:
+                if any(len(group) > 1 for group in groups):
+                    raise Exception("An ordering cannot express tied candidates")
+                ballot = [group[0] for group in groups]
+            elif ballot_notation == BALLOT_NOTATION_GROUPING:
+                ballot = groups
+            elif ballot_notation == BALLOT_NOTATION_RANKING:
+                ballot = dict((candidate, rank + 1) for rank, group in enumerate(groups) for candidate in group)
+            elif ballot_notation == BALLOT_NOTATION_RATING:
+                ballot = dict((candidate, len(groups) - rank) for rank, group in enumerate(groups) for candidate in group)
+            else:
+                raise Exception("Unknown notation specified", ballot_notation)
+            yield {"count": count, "ballot": ballot}
@@ -0,0 +1,261 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Runs many small elections at once. Elections are grouped by voting system
+# and split into chunks, and each chunk's elections are grouped again by their
+# number of candidates, so the ballots of a whole group can be stacked into
+# arrays and tallied together. SchulzeMethod is counted this way, since its
+# pairwise matrices and widest paths dominate the cost of an election. Elections
+# it can't settle without breaking a tie, groups with fractional ballot counts
+# (whose sums could round differently) and elections under any other voting
+# system are handed to the voting system itself, where the gain comes from
+# spreading chunks across an executor. Either way, each result equals the
+# election's as_dict(), or with winners_only=True just its winner, in which
+# case stacked elections are settled without building any per-election pairs.
+#
+#     >>> from py3votecore.batch import run_batch
+#     >>> results = run_batch(polls, SchulzeMethod, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING, executor=8)
+from .ballot_profile import BallotProfile, RANK_DTYPE, UNRANKED, PAIRWISE_CHUNK_CELLS
+from .ballot_profile import BALLOT_NOTATION_ORDERING, BALLOT_NOTATION_RATING
+from .abstract_classes import SingleWinnerVotingSystem, MultipleWinnerVotingSystem
+from .condorcet import CondorcetHelper
+from .schulze_helper import SchulzeHelper
+from .schulze_method import SchulzeMethod
+from concurrent.futures import Executor
+import itertools
+import numpy
+
+# Number of elections handed to a worker at a time
+BATCH_CHUNK_SIZE = 1000
+
+
+# Runs each election and returns their results in order. Elections are lists
+# of ballots for the given voting system, or (voting system, ballots) pairs if
+# none is given. Any other keyword arguments are passed to the voting systems.
+# Given an Executor, or a number of worker processes, chunks of elections are
+# run in parallel. With winners_only=True, each result is the election's
+# winner (or set of winners, or order) rather than its as_dict().
+def run_batch(elections, system=None, executor=None, winners_only=False, **options):
+    if system is not None:
+        elections = [(system, ballots) for ballots in elections]
+
+    chunks = []
+    by_system = {}
+    for position, (system, ballots) in enumerate(elections):
+        by_system.setdefault(system, []).append((position, ballots))
+    for system, entries in by_system.items():
+        for start in range(0, len(entries), BATCH_CHUNK_SIZE):
+            chunks.append((system, entries[start:start + BATCH_CHUNK_SIZE]))
+
+    results = [None] * len(elections)
+    for (system, entries), chunk_results in zip(chunks, run_chunks(chunks, executor, winners_only, options)):
+        for (position, ballots), result in zip(entries, chunk_results):
+            results[position] = result
+    return results
+
+
+def run_chunks(chunks, executor, winners_only, options):
+    if executor is None or executor == 1:
+        return [run_chunk(system, [ballots for position, ballots in entries], winners_only, options) for system, entries in chunks]
+    if isinstance(executor, Executor):
+        return submit_chunks(chunks, executor, winners_only, options)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=executor) as pool:
+        return submit_chunks(chunks, pool, winners_only, options)
+
+
+def submit_chunks(chunks, executor, winners_only, options):
+    futures = [
+        executor.submit(run_chunk, system, [ballots for position, ballots in entries], winners_only, options)
+        for system, entries in chunks
+    ]
+    return [future.result() for future in futures]
+
+
+# Runs a list of elections under a single voting system
+def run_chunk(system, elections, winners_only, options):
+    results = [None] * len(elections)
+    counter = BATCH_SYSTEMS.get(system)
+    if counter is not None:
+        notation = options.get("ballot_notation")
+        if notation is None:
+            notation = BALLOT_NOTATION_RATING
+        for candidate_count, group in stack_elections(elections, notation).items():
+            if candidate_count > 0 and group.integral:
+                for position, result in zip(group.positions, counter(group, winners_only)):
+                    results[position] = result
+
+    # Settle everything else one election at a time
+    for position, result in enumerate(results):
+        if result is None:
+            results[position] = election_result(system(elections[position], **options), winners_only)
+    return results
+
+
+def election_result(election, winners_only):
+    if not winners_only:
+        return election.as_dict()
+    if isinstance(election, SingleWinnerVotingSystem):
+        return election.winner
+    if isinstance(election, MultipleWinnerVotingSystem):
+        return election.winners
+    return election.order
+
+
+# This class holds a group of elections with the same number of candidates,
+# their ballots stacked into a single array of ranks (election x ballot x
+# candidate) and an array of ballot counts. Elections with fewer ballots than
+# others are padded with empty ballots counted zero times.
+class StackedElections(object):
+
+    def __init__(self, positions, candidates, ranks, counts):
+        self.positions = positions
+        self.candidates = candidates
+        self.ranks = ranks
+        self.counts = counts
+        self.integral = counts.dtype.kind in "iu" or bool((counts == numpy.floor(counts)).all())
+
+    def __len__(self):
+        return len(self.positions)
+
+    # Returns the pairwise matrix of each election, comparing the ballots of
+    # as many elections at a time as fit in a pairwise chunk
+    def pairwise_matrices(self):
+        elections, ballot_count, candidate_count = self.ranks.shape
+        matrices = numpy.zeros((elections, candidate_count, candidate_count), dtype=self.counts.dtype)
+        chunk = max(1, PAIRWISE_CHUNK_CELLS // max(1, ballot_count * candidate_count * candidate_count))
+        for start in range(0, elections, chunk):
+            ranks = self.ranks[start:start + chunk]
+            preferred = ranks[:, :, :, numpy.newaxis] < ranks[:, :, numpy.newaxis, :]
+            matrices[start:start + chunk] = numpy.einsum("eb,ebij->eij", self.counts[start:start + chunk], preferred)
+        return matrices
+
+
+# Reads every election's ballots and groups the elections by their number of
+# candidates. Ballots are first flattened into a single list of (candidate,
+# rank) cells, so numbering each election's candidates and filling in the
+# arrays of ranks happen in bulk.
+def stack_elections(elections, ballot_notation):
+    names, ranks, lengths, counts, ballot_counts = [], [], [], [], []
+    for ballots in elections:
+        ballot_counts.append(len(ballots))
+        counts.extend([ballot.get("count", 1) for ballot in ballots])
+        if ballot_notation == BALLOT_NOTATION_ORDERING:
+            preferences = [ballot["ballot"] for ballot in ballots]
+            preferences = [p if isinstance(p, (list, tuple)) else [p] for p in preferences]
+        else:
+            preferences = [BallotProfile.ballot_ranks(ballot["ballot"], ballot_notation) for ballot in ballots]
+            for ballot_ranks in preferences:
+                ranks.extend(ballot_ranks.values())
+        names.extend(itertools.chain.from_iterable(preferences))
+        lengths.extend(map(len, preferences))
+
+    # Number the candidates across every election, then within each
+    # election, in order of their first appearance
+    codes = dict((name, code) for code, name in enumerate(dict.fromkeys(names)))
+    cells = numpy.fromiter(map(codes.__getitem__, names), dtype=numpy.int64, count=len(names))
+    labels = list(codes)
+    lengths = numpy.array(lengths, dtype=numpy.int64)
+    if ballot_notation == BALLOT_NOTATION_ORDERING:
+        ranks = numpy.arange(len(names)) - numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+    else:
+        ranks = numpy.array(ranks, dtype=numpy.int64)
+    ballot_counts = numpy.array(ballot_counts, dtype=numpy.int64)
+    ballot_election = numpy.repeat(numpy.arange(len(elections)), ballot_counts)
+    cell_ballot = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    cell_election = ballot_election[cell_ballot]
+    keys, first, inverse = numpy.unique(cell_election * max(1, len(codes)) + cells, return_index=True, return_inverse=True)
+    key_election = keys // max(1, len(codes))
+    order = numpy.lexsort((first, key_election))
+    local = numpy.empty(len(keys), dtype=numpy.int64)
+    candidate_counts = numpy.bincount(key_election, minlength=len(elections))
+    key_starts = numpy.concatenate([[0], numpy.cumsum(candidate_counts)[:-1]])
+    local[order] = numpy.arange(len(keys)) - key_starts[key_election[order]]
+    cell_candidate = local[inverse.reshape(-1)]
+    key_labels = (keys % max(1, len(codes)))[order].tolist()
+
+    ballot_starts = numpy.concatenate([[0], numpy.cumsum(ballot_counts)[:-1]])
+    ballot_position = numpy.arange(len(lengths)) - ballot_starts[ballot_election]
+    counts = numpy.array(counts)
+
+    groups = {}
+    for candidate_count in numpy.unique(candidate_counts).tolist():
+        selected = numpy.flatnonzero(candidate_counts == candidate_count)
+        group_index = numpy.full(len(elections), -1, dtype=numpy.int64)
+        group_index[selected] = numpy.arange(len(selected))
+        ballot_count = max(1, int(ballot_counts[selected].max()))
+
+        group_ranks = numpy.full((len(selected), ballot_count, candidate_count), UNRANKED, dtype=RANK_DTYPE)
+        in_group = group_index[cell_election] >= 0
+        group_ranks[
+            group_index[cell_election[in_group]],
+            ballot_position[cell_ballot[in_group]],
+            cell_candidate[in_group],
+        ] = ranks[in_group]
+        group_counts = numpy.zeros((len(selected), ballot_count), dtype=counts.dtype)
+        in_group = group_index[ballot_election] >= 0
+        group_counts[group_index[ballot_election[in_group]], ballot_position[in_group]] = counts[in_group]
+
+        candidates = [
+            [labels[code] for code in key_labels[start:start + candidate_count]]
+            for start in key_starts[selected].tolist()
+        ]
+        groups[candidate_count] = StackedElections(selected.tolist(), candidates, group_ranks, group_counts)
+    return groups
+
+
+# Finds the candidates no one beats in each election and, failing those, the
+# Schulze winners through the widest paths of every election at once. Pairs
+# and actions are only built for the elections settled here, and only if their
+# as_dict() is wanted.
+def schulze_method_results(group, winners_only=False):
+    matrices = group.pairwise_matrices()
+    strong = numpy.where(matrices > matrices.transpose(0, 2, 1), matrices, 0)
+    unbeaten = ~(strong > 0).any(axis=1)
+    paths = strong
+    for k in range(strong.shape[1]):
+        paths = numpy.maximum(paths, numpy.minimum(paths[:, :, k, numpy.newaxis], paths[:, numpy.newaxis, k, :]))
+    winners = (paths >= paths.transpose(0, 2, 1)).all(axis=2)
+
+    # An election is settled by a single unbeaten candidate or, if there is
+    # none, by a single Schulze winner
+    unbeaten_count = unbeaten.sum(axis=1)
+    completed = unbeaten_count == 0
+    settled = (unbeaten_count == 1) | (completed & (winners.sum(axis=1) == 1))
+    winner_index = numpy.where(completed, winners.argmax(axis=1), unbeaten.argmax(axis=1))
+
+    results = [None] * len(group)
+    for i in numpy.flatnonzero(settled).tolist():
+        candidates = group.candidates[i]
+        winner = candidates[int(winner_index[i])]
+        if winners_only:
+            results[i] = winner
+            continue
+        pairs = CondorcetHelper.matrix_into_pairs(candidates, matrices[i])
+        results[i] = {
+            "candidates": set(candidates),
+            "pairs": pairs,
+            "strong_pairs": CondorcetHelper.remove_weak_pairs(pairs),
+            "winner": winner,
+        }
+        if completed[i]:
+            graph = CondorcetHelper.pairs_into_graph(candidates, results[i]["strong_pairs"])
+            results[i]["actions"] = SchulzeHelper.schwartz_set_actions(graph)
+    return results
+
+
+BATCH_SYSTEMS = {
+    SchulzeMethod: schulze_method_results,
+}
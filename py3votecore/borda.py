@@ -17,6 +17,7 @@ from .abstract_classes import AbstractSingleWinnerVotingSystem
 from .borda_at_large import BordaAtLarge
 
 class Borda(AbstractSingleWinnerVotingSystem):
+    LAZY_RESULTS = AbstractSingleWinnerVotingSystem.LAZY_RESULTS + ("tallies",)
 
     def __init__(self, ballots, tie_breaker=None):
         """
@@ -18,6 +18,7 @@ from .common_functions import matching_keys, unique_permutations
 import copy
 
 class BordaAtLarge(MultipleWinnerVotingSystem):
+    LAZY_RESULTS = MultipleWinnerVotingSystem.LAZY_RESULTS + ("tallies",)
     
     def __init__(self, ballots: list, tie_breaker=None, required_winners: int=1):
         """
@@ -14,7 +14,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .borda import Borda
-import networkx as nx
 
 
 def AverageFit(ballots: list, preferred_candidate: str, k: int)->list or bool:
@@ -223,6 +222,7 @@ def legal_manipulation(manipulators: list, candidates: set)->list:
     >>> legal_manipulation([["C","D","B","E","A"],["A","E","D","C","B"],["D","A","E","E","B"],["D","E","A","A","B"],["D","C","C","C","B"]], {"A", "B", "C", "D", "E"})# doctest:+ELLIPSIS
     [...]
     """
+    import networkx as nx                               #  Loaded here, so importing the heuristics doesn't load networkx.
     G = nx.Graph()
     G.add_nodes_from([j for j in range(len(manipulators))], bipartite=0)
     G.add_nodes_from(candidates, bipartite=1)
@@ -0,0 +1,180 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Caches the as_dict() of elections by a hash of what determines them: the
+# voting system, the ballots (with identical ballots merged and their order
+# ignored), the options passed and CACHE_VERSION. Results are kept in a bounded
+# LRU in memory and, optionally, as JSON files in a directory shared between
+# processes. Reading them back never runs code, but anyone able to write to the
+# directory can still plant wrong results, so it should only be writable by
+# trusted processes. A result that needed a random tie breaker to settle is
+# never cached, since running the election again could come out differently.
+#
+#     >>> from py3votecore.cache import ResultCache
+#     >>> cache = ResultCache(max_entries=256, directory="/var/cache/votes")
+#     >>> cache.run(SchulzeSTV, ballots, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING)
+from .ballot_profile import BallotProfile, BALLOT_NOTATION_GROUPING
+from .tie_breaker import TieBreaker
+from collections import OrderedDict
+from decimal import Decimal
+import copy
+import hashlib
+import json
+import os
+import tempfile
+
+# Part of every key. Bump it whenever a change alters what any voting system
+# returns, so results stored by earlier releases are no longer found.
+CACHE_VERSION = "20230116.00-1"
+
+# Options that change how a count is run but never its result
+UNCACHED_OPTIONS = ("executor", "lazy")
+
+
+class ResultCache(object):
+
+    def __init__(self, max_entries=1024, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    # Returns the as_dict() of the election, counting it only if it isn't cached
+    def run(self, system, ballots, **options):
+        key = self.key(system, ballots, options)
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = system(ballots, **options).as_dict()
+        if options.get("tie_breaker") is not None or "tie_breaker" not in result:
+            self.put(key, result)
+        return result
+
+    @staticmethod
+    def key(system, ballots, options):
+        if isinstance(ballots, BallotProfile):
+            ballots = list(ballots.as_ballots(BALLOT_NOTATION_GROUPING))
+            options = dict(options, ballot_profile=True)
+
+        # Merge identical ballots and sort them
+        counts = {}
+        for ballot in ballots:
+            ballot_key = canonical(ballot["ballot"])
+            counts[ballot_key] = counts.get(ballot_key, 0) + ballot.get("count", 1)
+        profile = sorted("%s*%r" % (ballot_key, count) for ballot_key, count in counts.items())
+
+        options = dict((name, value) for name, value in options.items() if name not in UNCACHED_OPTIONS)
+        if isinstance(options.get("tie_breaker"), TieBreaker):
+            options["tie_breaker"] = options["tie_breaker"].as_list()
+        material = canonical([CACHE_VERSION, "%s.%s" % (system.__module__, system.__qualname__), profile, options])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return copy.deepcopy(self.entries[key])
+        if self.directory is not None:
+            try:
+                with open(self.path(key), encoding="utf-8") as f:
+                    result = decode(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError):
+                return None
+            self.remember(key, result)
+            return copy.deepcopy(result)
+        return None
+
+    # Timings describe the count that produced a result, so they aren't kept
+    def put(self, key, result):
+        result = copy.deepcopy(result)
+        result.pop("timings", None)
+        self.remember(key, result)
+        if self.directory is not None:
+
+            # Results naming candidates JSON can't hold stay in memory only
+            try:
+                data = json.dumps(encode(result))
+            except TypeError:
+                return
+
+            # Write to a temporary file first so readers never see half a result
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, delete=False) as f:
+                f.write(data)
+            os.replace(f.name, self.path(key))
+
+    def remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# A string that is the same for equal ballots and options, whatever the order
+# of their dictionaries and sets
+def canonical(value):
+    if isinstance(value, dict):
+        return "{%s}" % ",".join(sorted("%s:%s" % (canonical(k), canonical(v)) for k, v in value.items()))
+    elif isinstance(value, (set, frozenset)):
+        return "set(%s)" % ",".join(sorted(canonical(v) for v in value))
+    elif isinstance(value, (list, tuple)):
+        return "[%s]" % ",".join(canonical(v) for v in value)
+    return repr(value)
+
+
+# Results hold sets, tuples (also as dictionary keys) and Decimals, so each
+# is stored as a single-key object naming its type
+def encode(value):
+    if isinstance(value, dict):
+        return {"dict": [[encode(k), encode(v)] for k, v in value.items()]}
+    elif isinstance(value, (set, frozenset)):
+        return {"set": [encode(v) for v in value]}
+    elif isinstance(value, tuple):
+        return {"tuple": [encode(v) for v in value]}
+    elif isinstance(value, list):
+        return [encode(v) for v in value]
+    elif isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    elif value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError("Cannot store %r" % (value,))
+
+
+def decode(value):
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    elif isinstance(value, dict):
+        (kind, content), = value.items()
+        if kind == "dict":
+            return dict((decode(k), decode(v)) for k, v in content)
+        elif kind == "set":
+            return set(decode(v) for v in content)
+        elif kind == "tuple":
+            return tuple(decode(v) for v in content)
+        elif kind == "decimal":
+            return Decimal(content)
+        raise ValueError("Unknown stored type", kind)
+    return value
@@ -1,3 +1,6 @@
+from .ballot_profile import BallotProfile, BALLOT_NOTATION_GROUPING, BALLOT_NOTATION_ORDERING
+
+
 def matching_keys(dict, target_value):
     return set([
         key
@@ -19,3 +22,29 @@ def unique_permutations(xs):
             ts.remove(x)
             for ps in unique_permutations(ts):
                 yield [x] + ps
+
+
+# Merges identical ballots into a single ballot carrying their summed count.
+# Dictionary ballots are compared by the order they express rather than by
+# their raw values, so {"A": 10, "B": 5} and {"A": 2, "B": 1} are merged.
+def aggregate_ballots(ballots, ballot_notation=None):
+    aggregated = {}
+    for ballot in ballots:
+        count = ballot.get("count", 1)
+        key = ballot_key(ballot["ballot"], ballot_notation)
+        if key in aggregated:
+            aggregated[key]["count"] += count
+        else:
+            aggregated[key] = {"count": count, "ballot": ballot["ballot"]}
+    return list(aggregated.values())
+
+
+def ballot_key(ballot, ballot_notation=None):
+    if isinstance(ballot, dict):
+        return frozenset(BallotProfile.ballot_ranks(ballot, ballot_notation).items())
+    elif ballot_notation == BALLOT_NOTATION_GROUPING:
+        return tuple(frozenset(group) for group in ballot)
+    elif ballot_notation in (None, BALLOT_NOTATION_ORDERING):
+        return tuple(ballot) if isinstance(ballot, (list, tuple)) else (ballot,)
+    else:
+        raise Exception("Unknown notation specified", ballot_notation)
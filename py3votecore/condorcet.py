@@ -15,38 +15,52 @@
 
 from abc import ABCMeta, abstractmethod
 from .abstract_classes import SingleWinnerVotingSystem
-from pygraph.classes.digraph import digraph
+from .ballot_profile import BallotProfile
+from . import ballot_profile
+from .common_functions import aggregate_ballots
+from .instrumentation import timed
+from .digraph import Digraph
 import itertools
 
 
 class CondorcetHelper(object):
 
-    BALLOT_NOTATION_GROUPING = 0
-    BALLOT_NOTATION_RANKING = 1
-    BALLOT_NOTATION_RATING = 2
+    BALLOT_NOTATION_GROUPING = ballot_profile.BALLOT_NOTATION_GROUPING
+    BALLOT_NOTATION_RANKING = ballot_profile.BALLOT_NOTATION_RANKING
+    BALLOT_NOTATION_RATING = ballot_profile.BALLOT_NOTATION_RATING
 
+    @timed("standardize_ballots")
     def standardize_ballots(self, ballots, ballot_notation):
 
-        self.ballots = ballots
-        if ballot_notation == CondorcetHelper.BALLOT_NOTATION_GROUPING:
-            for ballot in self.ballots:
+        # Ballot profiles already rank unlisted candidates below the others, so
+        # they are counted as they are, less any candidate nobody ranked
+        if isinstance(ballots, BallotProfile):
+            columns = (ballots.ranks != ballot_profile.UNRANKED).any(axis=0).nonzero()[0].tolist()
+            if len(columns) < len(ballots.candidates):
+                ballots = BallotProfile([ballots.candidates[i] for i in columns], ballots.ranks[:, columns], ballots.counts)
+            self.ballots = []
+            self.profile = ballots
+            self.candidates = set(ballots.candidates)
+            return
+
+        # Merge identical ballots before standardizing them. Standardized
+        # ballots are always fresh dictionaries, leaving the input untouched.
+        self.ballots = []
+        for ballot in aggregate_ballots(ballots, ballot_notation):
+            if ballot_notation == CondorcetHelper.BALLOT_NOTATION_GROUPING:
                 new_ballot = {}
                 r = len(ballot["ballot"])
                 for rank in ballot["ballot"]:
                     for candidate in rank:
                         new_ballot[candidate] = r
                     r -= 1
-                ballot["ballot"] = new_ballot
-        elif ballot_notation == CondorcetHelper.BALLOT_NOTATION_RANKING:
-            for ballot in self.ballots:
-                for candidate, rating in ballot["ballot"].items():
-                    ballot["ballot"][candidate] = -float(rating)
-        elif ballot_notation == CondorcetHelper.BALLOT_NOTATION_RATING or ballot_notation is None:
-            for ballot in self.ballots:
-                for candidate, rating in ballot["ballot"].items():
-                    ballot["ballot"][candidate] = float(rating)
-        else:
-            raise Exception("Unknown notation specified", ballot_notation)
+            elif ballot_notation == CondorcetHelper.BALLOT_NOTATION_RANKING:
+                new_ballot = dict((candidate, -float(rating)) for candidate, rating in ballot["ballot"].items())
+            elif ballot_notation == CondorcetHelper.BALLOT_NOTATION_RATING or ballot_notation is None:
+                new_ballot = dict((candidate, float(rating)) for candidate, rating in ballot["ballot"].items())
+            else:
+                raise Exception("Unknown notation specified", ballot_notation)
+            self.ballots.append({"count": ballot["count"], "ballot": new_ballot})
 
         self.candidates = set()
         for ballot in self.ballots:
@@ -57,6 +71,9 @@ class CondorcetHelper(object):
             for candidate in self.candidates - set(ballot["ballot"].keys()):
                 ballot["ballot"][candidate] = lowest_preference
 
+        # Keep an integer-indexed copy of the ballots for the pairwise tallies
+        self.profile = BallotProfile.from_ballots(self.ballots, CondorcetHelper.BALLOT_NOTATION_RATING)
+
     def graph_winner(self):
         losing_candidates = set([edge[1] for edge in self.graph.edges()])
         winning_candidates = set(self.graph.nodes()) - losing_candidates
@@ -68,23 +85,40 @@ class CondorcetHelper(object):
         else:
             self.condorcet_completion_method()
 
+    # Tallies every ordered pair of candidates in a single pass over the
+    # ballot profile
+    @timed("pairwise")
+    def ballots_into_pairs(self):
+        return self.matrix_into_pairs(self.profile.candidates, self.profile.pairwise_matrix())
+
+    @staticmethod
+    def matrix_into_pairs(candidates, matrix):
+        matrix = matrix.tolist()
+        return dict([
+            ((candidates[i], candidates[j]), matrix[i][j])
+            for i, j in itertools.permutations(range(len(candidates)), 2)
+        ])
+
+    @staticmethod
+    def pairs_into_graph(candidates, pairs):
+        return Digraph(candidates, pairs)
+
     @staticmethod
     def ballots_into_graph(candidates, ballots):
-        graph = digraph()
-        graph.add_nodes(candidates)
-        for pair in itertools.permutations(candidates, 2):
-            graph.add_edge(pair, sum([
-                ballot["count"]
-                for ballot in ballots
-                if ballot["ballot"][pair[0]] > ballot["ballot"][pair[1]]
-            ]))
-        return graph
+        profile = BallotProfile.from_ballots(ballots, CondorcetHelper.BALLOT_NOTATION_RATING, candidates=list(candidates))
+        return CondorcetHelper.pairs_into_graph(candidates, CondorcetHelper.matrix_into_pairs(profile.candidates, profile.pairwise_matrix()))
 
     @staticmethod
     def edge_weights(graph):
+        return graph.edge_weights()
+
+    # Keeps only the pairs that beat their reverse, dropping both sides of a tie
+    @staticmethod
+    def remove_weak_pairs(pairs):
         return dict([
-            (edge, graph.edge_weight(edge))
-            for edge in graph.edges()
+            (pair, weight)
+            for pair, weight in pairs.items()
+            if weight > pairs.get((pair[1], pair[0]), 0)
         ])
 
     @staticmethod
@@ -101,6 +135,7 @@ class CondorcetHelper(object):
 
 
 class CondorcetSystem(SingleWinnerVotingSystem, CondorcetHelper, metaclass=ABCMeta):
+    LAZY_RESULTS = SingleWinnerVotingSystem.LAZY_RESULTS + ("pairs", "strong_pairs", "graph")
 
     @abstractmethod
     def __init__(self, ballots, tie_breaker=None, ballot_notation=None):
@@ -108,10 +143,9 @@ class CondorcetSystem(SingleWinnerVotingSystem, CondorcetHelper, metaclass=ABCMe
         super(CondorcetSystem, self).__init__(self.ballots, tie_breaker=tie_breaker)
 
     def calculate_results(self):
-        self.graph = self.ballots_into_graph(self.candidates, self.ballots)
-        self.pairs = self.edge_weights(self.graph)
-        self.remove_weak_edges(self.graph)
-        self.strong_pairs = self.edge_weights(self.graph)
+        self.pairs = self.ballots_into_pairs()
+        self.strong_pairs = self.remove_weak_pairs(self.pairs)
+        self.graph = self.pairs_into_graph(self.candidates, self.strong_pairs)
         self.graph_winner()
 
     def as_dict(self):
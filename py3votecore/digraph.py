@@ -0,0 +1,239 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This class holds a weighted directed graph. Nodes are numbered in the order
+# they are added and each keeps its outgoing edges in a dictionary of weights
+# keyed by the number of the node they lead to, so nodes and edges are listed
+# in the order they were added. Sets of nodes are handled as integer bitsets.
+class Digraph(object):
+
+    def __init__(self, nodes=None, edges=None):
+        self.index = {}
+        self.labels = []
+        self.successors = []
+        self.predecessors = []
+        self.add_nodes(nodes or [])
+        for edge, weight in (edges or {}).items():
+            self.add_edge(edge, weight)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def nodes(self):
+        return list(self.index)
+
+    def has_node(self, node):
+        return node in self.index
+
+    def add_node(self, node):
+        if node in self.index:
+            raise Exception("Node already in graph", node)
+        self.index[node] = len(self.labels)
+        self.labels.append(node)
+        self.successors.append({})
+        self.predecessors.append({})
+
+    def add_nodes(self, nodes):
+        for node in nodes:
+            self.add_node(node)
+
+    def del_node(self, node):
+        i = self.index.pop(node)
+        for j in self.successors[i]:
+            del self.predecessors[j][i]
+        for j in self.predecessors[i]:
+            del self.successors[j][i]
+        self.successors[i] = self.predecessors[i] = None
+
+    def edges(self):
+        labels = self.labels
+        return [
+            (labels[i], labels[j])
+            for i in self.index.values()
+            for j in self.successors[i]
+        ]
+
+    def edge_weights(self):
+        labels = self.labels
+        return dict(
+            ((labels[i], labels[j]), weight)
+            for i in self.index.values()
+            for j, weight in self.successors[i].items()
+        )
+
+    def has_edge(self, edge):
+        i, j = self.index.get(edge[0]), self.index.get(edge[1])
+        return i is not None and j in self.successors[i]
+
+    def add_edge(self, edge, weight=1):
+        i, j = self.index[edge[0]], self.index[edge[1]]
+        if j in self.successors[i]:
+            raise Exception("Edge already in graph", edge)
+        self.successors[i][j] = weight
+        self.predecessors[j][i] = weight
+
+    def del_edge(self, edge):
+        i, j = self.index[edge[0]], self.index[edge[1]]
+        del self.successors[i][j]
+        del self.predecessors[j][i]
+
+    def edge_weight(self, edge):
+        return self.successors[self.index[edge[0]]][self.index[edge[1]]]
+
+    def set_edge_weight(self, edge, weight):
+        i, j = self.index[edge[0]], self.index[edge[1]]
+        self.successors[i][j] = self.predecessors[j][i] = weight
+
+    def neighbors(self, node):
+        return [self.labels[j] for j in self.successors[self.index[node]]]
+
+    def incidents(self, node):
+        return [self.labels[j] for j in self.predecessors[self.index[node]]]
+
+    @staticmethod
+    def bit_indices(bits):
+        indices = []
+        while bits:
+            low = bits & -bits
+            indices.append(low.bit_length() - 1)
+            bits ^= low
+        return indices
+
+    def node_set(self, bits):
+        return [self.labels[i] for i in self.bit_indices(bits)]
+
+    # Splits the graph into strongly connected components with an iterative
+    # version of Tarjan's algorithm. Components are returned as bitsets, every
+    # component coming after all those it has edges into.
+    def strongly_connected_components(self):
+        successors = self.successors
+        components = []
+        order, low = {}, {}
+        stack, on_stack = [], set()
+        for root in self.index.values():
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors[root]))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in order:
+                        order[child] = low[child] = len(order)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(successors[child])))
+                        break
+                    elif child in on_stack:
+                        low[node] = min(low[node], order[child])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == order[node]:
+                        component = 0
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component |= 1 << member
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    # Numbers the component each node belongs to
+    def component_index(self, components):
+        return dict(
+            (i, c)
+            for c, component in enumerate(components)
+            for i in self.bit_indices(component)
+        )
+
+    # Lists the nodes reachable from each node, itself included. Components
+    # come after those they reach, so the bitset of nodes reachable from each
+    # is built from those already known.
+    def accessibility(self):
+        components = self.strongly_connected_components()
+        component_of = self.component_index(components)
+        reach = []
+        for c, component in enumerate(components):
+            bits = component
+            for i in self.bit_indices(component):
+                for j in self.successors[i]:
+                    bits |= reach[component_of[j]] if component_of[j] != c else 0
+            reach.append(bits)
+        return dict(
+            (node, self.node_set(reach[component_of[i]]))
+            for node, i in self.index.items()
+        )
+
+    # Lists the nodes each node can reach and be reached from, itself included
+    def mutual_accessibility(self):
+        components = self.strongly_connected_components()
+        component_of = self.component_index(components)
+        return dict(
+            (node, self.node_set(components[component_of[i]]))
+            for node, i in self.index.items()
+        )
+
+    # Finds the nodes whose strongly connected component can be reached from
+    # another, which are the nodes outside the Schwartz set
+    def dominated_nodes(self):
+        components = self.strongly_connected_components()
+        component_of = self.component_index(components)
+        dominated = set(
+            component_of[j]
+            for i in self.index.values()
+            for j in self.successors[i]
+            if component_of[i] != component_of[j]
+        )
+        return set(
+            self.labels[i]
+            for c in dominated
+            for i in self.bit_indices(components[c])
+        )
+
+    # Returns the nodes along some cycle, in order, or an empty list if the
+    # graph has none
+    def find_cycle(self):
+        successors = self.successors
+        state = {}
+        for root in self.index.values():
+            if root in state:
+                continue
+            state[root] = True
+            path = [root]
+            work = [iter(successors[root])]
+            while work:
+                for child in work[-1]:
+                    if child not in state:
+                        state[child] = True
+                        path.append(child)
+                        work.append(iter(successors[child]))
+                        break
+                    elif state[child]:
+                        return [self.labels[i] for i in path[path.index(child):]]
+                else:
+                    state[path.pop()] = False
+                    work.pop()
+        return []
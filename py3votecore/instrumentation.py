@@ -0,0 +1,167 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Opt-in timing and counting of the phases of an election. While enabled,
+# every voting system records the wall time spent in each phase along with
+# counters of the work done, keeps them in its timings attribute (and in the
+# "timings" key of as_dict) and passes them to the hook, if any. While
+# disabled, each instrumented call costs a single lookup.
+#
+#     with instrumented(hook=lambda system, timings: print(timings)):
+#         SchulzeSTV(ballots, required_winners=3)
+from abc import ABCMeta
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+import functools
+import time
+
+_enabled = False
+_hook = None
+_recorder = ContextVar("recorder", default=None)
+_disabled_phase = nullcontext()
+
+
+def enable(hook=None):
+    global _enabled, _hook
+    _enabled, _hook = True, hook
+
+
+def disable():
+    global _enabled, _hook
+    _enabled, _hook = False, None
+
+
+@contextmanager
+def instrumented(hook=None):
+    previous = (_enabled, _hook)
+    enable(hook)
+    try:
+        yield
+    finally:
+        if previous[0]:
+            enable(previous[1])
+        else:
+            disable()
+
+
+# Accumulates the time spent in each phase and the counters of a single
+# voting system
+class Recorder(object):
+
+    def __init__(self):
+        self.seconds = {}
+        self.counters = {}
+
+    def add(self, other):
+        for phase, seconds in other.seconds.items():
+            if phase != "total":
+                self.seconds[phase] = self.seconds.get(phase, 0) + seconds
+        for counter, value in other.counters.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def as_dict(self):
+        return {"seconds": dict(self.seconds), "counters": dict(self.counters)}
+
+
+class _Phase(object):
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        seconds = self.recorder.seconds
+        seconds[self.name] = seconds.get(self.name, 0) + time.perf_counter() - self.start
+        return False
+
+
+# Times the enclosed block as the named phase
+def phase(name):
+    recorder = _recorder.get()
+    if recorder is None:
+        return _disabled_phase
+    return _Phase(recorder, name)
+
+
+def count(name, value=1):
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.counters[name] = recorder.counters.get(name, 0) + value
+
+
+# Decorates a function so each call is timed as the named phase and, given a
+# counter, counted
+def timed(name, counter=None):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return function(*args, **kwargs)
+            if counter is not None:
+                recorder.counters[counter] = recorder.counters.get(counter, 0) + 1
+            with _Phase(recorder, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Runs work under a fresh recorder and adds what it records to the timings of
+# the system, which work returns if not given. Systems built during the work
+# also count towards the outer one, and only the outermost system is passed
+# to the hook.
+def record(work, system=None):
+    if not _enabled:
+        return work()
+    recorder = Recorder()
+    token = _recorder.set(recorder)
+    try:
+        with _Phase(recorder, "total"):
+            result = work()
+    finally:
+        _recorder.reset(token)
+        outer = _recorder.get()
+        if outer is not None:
+            outer.add(recorder)
+
+    if system is None:
+        system = result
+    timings = recorder.as_dict()
+    for key, values in system.__dict__.get("timings", {}).items():
+        for name, value in values.items():
+            timings[key][name] = timings[key].get(name, 0) + value
+    system.timings = timings
+    if _hook is not None and outer is None:
+        _hook(system, system.timings)
+    return result
+
+
+# Voting systems do part of their work (such as standardizing ballots) before
+# reaching VotingSystem.__init__, so recording wraps the whole construction.
+# Systems built with lazy=True are flagged before their constructor runs, so
+# it stops once the ballots are standardized.
+class InstrumentedMeta(ABCMeta):
+
+    def __call__(cls, *args, **kwargs):
+        if not kwargs.pop("lazy", False):
+            return record(lambda: super(InstrumentedMeta, cls).__call__(*args, **kwargs))
+
+        system = cls.__new__(cls)
+        system.lazy = True
+        record(lambda: system.__init__(*args, **kwargs), system)
+        return system
@@ -3,6 +3,7 @@ from .stv import STV
 
 
 class IRV(AbstractSingleWinnerVotingSystem):
+    LAZY_RESULTS = AbstractSingleWinnerVotingSystem.LAZY_RESULTS + ("quota", "rounds", "remaining_candidates")
 
     def __init__(self, ballots, tie_breaker=None):
         super(IRV, self).__init__(ballots, STV, tie_breaker=tie_breaker)
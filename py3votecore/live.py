@@ -0,0 +1,265 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from .ballot_profile import BallotProfile, RANK_DTYPE, UNRANKED
+from .condorcet import CondorcetHelper
+from .schulze_by_graph import SchulzeMethodByGraph
+from .ranked_pairs import RankedPairsByGraph
+from .tie_breaker import TieBreaker
+from bisect import bisect_left, insort
+import numpy
+
+
+# This class keeps the pairwise matrix of an ongoing Condorcet election as
+# ballots are added and withdrawn, each in time proportional to the square of
+# the number of candidates. Winners are only worked out from the matrix when
+# asked for, and match those of the same system run over every ballot counted.
+class CondorcetTally(object):
+
+    def __init__(self, ballot_notation=None):
+        self.ballot_notation = ballot_notation
+        self.candidates = []
+        self.index = {}
+        self.mentions = numpy.zeros(0, dtype=numpy.int64)
+        self.matrix = numpy.zeros((0, 0), dtype=numpy.int64)
+        self.ballots = {}
+
+    def add(self, ballot, count=1):
+        self.tally(BallotProfile.ballot_ranks(ballot, self.ballot_notation), count)
+
+    def remove(self, ballot, count=1):
+        ranks = BallotProfile.ballot_ranks(ballot, self.ballot_notation)
+        if self.ballots.get(frozenset(ranks.items()), 0) < count:
+            raise Exception("Cannot remove a ballot that was not counted")
+        self.tally(ranks, -count)
+
+    def tally(self, ranks, count):
+        self.add_candidates(ranks)
+        key = frozenset(ranks.items())
+        self.ballots[key] = self.ballots.get(key, 0) + count
+        if not self.ballots[key]:
+            del self.ballots[key]
+
+        self.upcast(numpy.asarray(count).dtype)
+        row = numpy.full(len(self.candidates), UNRANKED, dtype=RANK_DTYPE)
+        columns = [self.index[candidate] for candidate in ranks]
+        row[columns] = list(ranks.values())
+        self.mentions[columns] += count
+        self.matrix += count * (row[:, numpy.newaxis] < row[numpy.newaxis, :])
+
+    def add_candidates(self, candidates):
+        new_candidates = [candidate for candidate in candidates if candidate not in self.index]
+        if not new_candidates:
+            return
+        old, new = len(self.candidates), len(self.candidates) + len(new_candidates)
+        for candidate in new_candidates:
+            self.index[candidate] = len(self.candidates)
+            self.candidates.append(candidate)
+        matrix = numpy.zeros((new, new), dtype=self.matrix.dtype)
+        matrix[:old, :old] = self.matrix
+
+        # Ballots already counted left the new candidates unranked
+        matrix[:old, old:] = self.mentions[:, numpy.newaxis]
+        self.matrix = matrix
+        self.mentions = numpy.concatenate([self.mentions, numpy.zeros(new - old, dtype=self.mentions.dtype)])
+
+    def upcast(self, dtype):
+        dtype = numpy.result_type(self.matrix.dtype, dtype)
+        if dtype != self.matrix.dtype:
+            self.mentions = self.mentions.astype(dtype)
+            self.matrix = self.matrix.astype(dtype)
+
+    # Candidates stay in the matrix once seen, but only those ranked on a
+    # counted ballot are standing
+    def standing(self):
+        columns = numpy.flatnonzero(self.mentions)
+        return [self.candidates[i] for i in columns], self.matrix[numpy.ix_(columns, columns)]
+
+    def pairs(self):
+        return CondorcetHelper.matrix_into_pairs(*self.standing())
+
+    def schulze_method(self, tie_breaker=None):
+        candidates, matrix = self.standing()
+        if not candidates:
+            raise Exception("No ballots have been counted")
+        return SchulzeMethodByGraph(CondorcetHelper.matrix_into_pairs(candidates, matrix), tie_breaker=tie_breaker, candidates=candidates)
+
+    def ranked_pairs(self, tie_breaker=None):
+        candidates, matrix = self.standing()
+        if not candidates:
+            raise Exception("No ballots have been counted")
+        return RankedPairsByGraph(CondorcetHelper.matrix_into_pairs(candidates, matrix), tie_breaker=tie_breaker, candidates=candidates)
+
+
+# This class keeps the tallies of an ongoing at-large election grouped into
+# buckets of equal score, with the distinct scores held in sorted order. Each
+# ballot only moves the candidates it names, and the leading candidates are
+# read off the top buckets, so winners are found without scanning every tally.
+# Results are counted on first access and kept until the next ballot arrives.
+class Leaderboard(object):
+
+    def __init__(self, required_winners=1, tie_breaker=None):
+        self.required_winners = required_winners
+        self.tie_breaker = tie_breaker
+        self.mentions = {}
+        self.tallies = {}
+        self.buckets = {}
+        self.scores = []
+        self.ballots = {}
+
+    def add(self, ballot, count=1):
+        self.tally(self.standardize_ballot(ballot), count)
+
+    def remove(self, ballot, count=1):
+        ballot = self.standardize_ballot(ballot)
+        if self.ballots.get(tuple(ballot), 0) < count:
+            raise Exception("Cannot remove a ballot that was not counted")
+        self.tally(ballot, -count)
+
+    def tally(self, ballot, count):
+        key = tuple(ballot)
+        self.ballots[key] = self.ballots.get(key, 0) + count
+        if not self.ballots[key]:
+            del self.ballots[key]
+        for attribute in ("counted", "candidates", "winners", "tied_winners", "used_tie_breaker"):
+            self.__dict__.pop(attribute, None)
+        self.update(ballot, count)
+
+    # Moves a candidate into the bucket for its new score, or out of the
+    # leaderboard altogether if the score is None
+    def set_tally(self, candidate, score):
+        if candidate in self.tallies:
+            old_score = self.tallies.pop(candidate)
+            bucket = self.buckets[old_score]
+            del bucket[candidate]
+            if not bucket:
+                del self.buckets[old_score]
+                del self.scores[bisect_left(self.scores, old_score)]
+        if score is not None:
+            self.tallies[candidate] = score
+            if score not in self.buckets:
+                self.buckets[score] = {}
+                insort(self.scores, score)
+            self.buckets[score][candidate] = None
+
+    # Groups of tied candidates with their score, best first, until at least
+    # k candidates are covered
+    def leaders(self, k=None):
+        groups = []
+        covered = 0
+        for score in reversed(self.scores):
+            if k is not None and covered >= k:
+                break
+            groups.append((score, set(self.buckets[score])))
+            covered += len(self.buckets[score])
+        return groups
+
+    def count(self):
+        if len(self.tallies) < self.required_winners:
+            raise Exception("Fewer candidates have been voted for than there are winners")
+        self.candidates = set(self.tallies)
+        self.used_tie_breaker = self.tie_breaker
+        if self.used_tie_breaker is None:
+            self.used_tie_breaker = TieBreaker(self.candidates)
+        elif isinstance(self.used_tie_breaker, list):
+            self.used_tie_breaker = TieBreaker(self.used_tie_breaker)
+
+        # Take the top buckets, breaking ties within the last one needed
+        winning_candidates = set()
+        for score in reversed(self.scores):
+            if len(winning_candidates) >= self.required_winners:
+                break
+            top_candidates = set(self.buckets[score])
+            if len(top_candidates | winning_candidates) > self.required_winners:
+                self.tied_winners = top_candidates.copy()
+                while len(top_candidates | winning_candidates) > self.required_winners:
+                    top_candidates.remove(self.used_tie_breaker.break_ties(top_candidates, True))
+            winning_candidates |= top_candidates
+        self.winners = winning_candidates
+        self.counted = True
+
+    def __getattr__(self, name):
+        if name in ("candidates", "winners", "tied_winners") and "counted" not in self.__dict__:
+            self.count()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    # The same as the as_dict of the at-large system over the counted ballots
+    def as_dict(self):
+        data = dict()
+        data["candidates"] = self.candidates
+        if self.used_tie_breaker.ties_broken:
+            data["tie_breaker"] = self.used_tie_breaker.as_list()
+        if hasattr(self, "tied_winners"):
+            data["tied_winners"] = self.tied_winners
+        data["winners"] = self.winners
+        data["tallies"] = dict(self.tallies)
+        return data
+
+
+# A live PluralityAtLarge count
+class PluralityTally(Leaderboard):
+
+    def standardize_ballot(self, ballot):
+        if not isinstance(ballot, list):
+            ballot = [ballot]
+        if len(ballot) > self.required_winners:
+            raise Exception("A ballot contained too many candidates")
+        return ballot
+
+    def update(self, ballot, count):
+        for candidate in ballot:
+            self.mentions[candidate] = self.mentions.get(candidate, 0) + count
+            if self.mentions[candidate]:
+                self.set_tally(candidate, self.mentions[candidate])
+            else:
+                del self.mentions[candidate]
+                self.set_tally(candidate, None)
+
+
+# A live BordaAtLarge count. A candidate at position i of a ballot scores
+# (number of candidates - 1 - i) times its count, so the arrival or departure
+# of a candidate rescores everyone, but any other ballot only moves the
+# candidates it names.
+class BordaTally(Leaderboard):
+
+    def __init__(self, required_winners=1, tie_breaker=None):
+        super(BordaTally, self).__init__(required_winners=required_winners, tie_breaker=tie_breaker)
+        self.position_sums = {}
+
+    def standardize_ballot(self, ballot):
+        if not isinstance(ballot, list):
+            ballot = [ballot]
+        if len(ballot) < self.required_winners:
+            raise Exception("A ballot contained too many candidates")
+        return ballot
+
+    def update(self, ballot, count):
+        candidate_count = len(self.mentions)
+        for position, candidate in enumerate(ballot):
+            self.mentions[candidate] = self.mentions.get(candidate, 0) + count
+            self.position_sums[candidate] = self.position_sums.get(candidate, 0) + count * position
+            if not self.mentions[candidate]:
+                del self.mentions[candidate]
+                del self.position_sums[candidate]
+                self.set_tally(candidate, None)
+
+        if len(self.mentions) != candidate_count:
+            candidates = self.mentions
+        else:
+            candidates = ballot
+        for candidate in candidates:
+            if candidate in self.mentions:
+                self.set_tally(candidate, (len(self.mentions) - 1) * self.mentions[candidate] - self.position_sums[candidate])
@@ -3,6 +3,7 @@ from .plurality_at_large import PluralityAtLarge
 
 
 class Plurality(AbstractSingleWinnerVotingSystem):
+    LAZY_RESULTS = AbstractSingleWinnerVotingSystem.LAZY_RESULTS + ("tallies",)
 
     def __init__(self, ballots, tie_breaker=None):
         super(Plurality, self).__init__(ballots, PluralityAtLarge, tie_breaker=tie_breaker)
@@ -20,6 +20,7 @@ import copy
 
 
 class PluralityAtLarge(MultipleWinnerVotingSystem):
+    LAZY_RESULTS = MultipleWinnerVotingSystem.LAZY_RESULTS + ("tallies",)
 
     def __init__(self, ballots, tie_breaker=None, required_winners=1):
         super(PluralityAtLarge, self).__init__(ballots, tie_breaker=tie_breaker, required_winners=required_winners)
@@ -14,52 +14,56 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .condorcet import CondorcetSystem, CondorcetHelper
-from pygraph.classes.digraph import digraph
-from pygraph.algorithms.cycles import find_cycle
-from .common_functions import matching_keys
-from copy import deepcopy
 
 
 # This class implements the Schulze Method (aka the beatpath method)
 class RankedPairs(CondorcetSystem, CondorcetHelper):
+    LAZY_RESULTS = CondorcetSystem.LAZY_RESULTS + ("rounds",)
 
     def __init__(self, ballots, tie_breaker=None, ballot_notation=None):
         super(RankedPairs, self).__init__(ballots, tie_breaker=tie_breaker, ballot_notation=ballot_notation)
 
     def condorcet_completion_method(self):
 
-        # Initialize the candidate graph
+        # Track, for each candidate, the set of candidates reachable from it
+        # through the locked pairs as a bitset (each reaching itself)
         self.rounds = []
-        graph = digraph()
-        graph.add_nodes(self.candidates)
-
-        # Loop until we've considered all possible pairs
-        remaining_strong_pairs = deepcopy(self.strong_pairs)
-        while len(remaining_strong_pairs) > 0:
-            r = {}
-
-            # Find the strongest pair
-            largest_strength = max(remaining_strong_pairs.values())
-            strongest_pairs = matching_keys(remaining_strong_pairs, largest_strength)
-            if len(strongest_pairs) > 1:
-                r["tied_pairs"] = strongest_pairs
-                strongest_pair = self.break_ties(strongest_pairs)
-            else:
-                strongest_pair = list(strongest_pairs)[0]
-            r["pair"] = strongest_pair
-
-            # If the pair would add a cycle, skip it
-            graph.add_edge(strongest_pair)
-            if len(find_cycle(graph)) > 0:
-                r["action"] = "skipped"
-                graph.del_edge(strongest_pair)
-            else:
-                r["action"] = "added"
-            del remaining_strong_pairs[strongest_pair]
-            self.rounds.append(r)
+        index = dict((candidate, i) for i, candidate in enumerate(self.candidates))
+        reachable = [1 << i for i in range(len(index))]
+        locked = {}
+
+        # Consider the pairs in groups of equal strength, strongest first
+        groups = {}
+        for pair, strength in self.strong_pairs.items():
+            groups.setdefault(strength, set()).add(pair)
+        for strength in sorted(groups, reverse=True):
+            tied_pairs = groups[strength]
+            while len(tied_pairs) > 0:
+                r = {}
+
+                # Find the strongest pair
+                if len(tied_pairs) > 1:
+                    r["tied_pairs"] = set(tied_pairs)
+                    strongest_pair = self.break_ties(tied_pairs)
+                else:
+                    strongest_pair = list(tied_pairs)[0]
+                r["pair"] = strongest_pair
+                tied_pairs.remove(strongest_pair)
+
+                # If the pair would add a cycle, skip it
+                winner, loser = index[strongest_pair[0]], index[strongest_pair[1]]
+                if reachable[loser] >> winner & 1:
+                    r["action"] = "skipped"
+                else:
+                    r["action"] = "added"
+                    locked[strongest_pair] = strength
+                    for i in range(len(reachable)):
+                        if reachable[i] >> winner & 1:
+                            reachable[i] |= reachable[loser]
+                self.rounds.append(r)
 
         self.old_graph = self.graph
-        self.graph = graph
+        self.graph = self.pairs_into_graph(self.candidates, locked)
         self.graph_winner()
 
     def as_dict(self):
@@ -67,3 +71,22 @@ class RankedPairs(CondorcetSystem, CondorcetHelper):
         if hasattr(self, 'rounds'):
             data["rounds"] = self.rounds
         return data
+
+
+# This class provides Ranked Pairs results, but bypasses ballots and uses preference tallies instead.
+class RankedPairsByGraph(RankedPairs):
+
+    def __init__(self, edges, tie_breaker=None, ballot_notation=None, candidates=None):
+        self.edges = edges
+        self.edge_candidates = candidates
+        super(RankedPairsByGraph, self).__init__([], tie_breaker=tie_breaker, ballot_notation=ballot_notation)
+
+    def standardize_ballots(self, ballots, ballot_notation):
+        self.ballots = []
+        if self.edge_candidates is not None:
+            self.candidates = set(self.edge_candidates)
+        else:
+            self.candidates = set([edge[0] for edge, weight in self.edges.items()]) | set([edge[1] for edge, weight in self.edges.items()])
+
+    def ballots_into_pairs(self):
+        return dict(self.edges)
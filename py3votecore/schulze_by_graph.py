@@ -16,26 +16,27 @@
 from .schulze_method import SchulzeMethod
 from .schulze_helper import SchulzeHelper
 from .abstract_classes import AbstractOrderingVotingSystem
-from pygraph.classes.digraph import digraph
 
 
 # This class provides Schulze Method results, but bypasses ballots and uses preference tallies instead.
 class SchulzeMethodByGraph(SchulzeMethod):
 
-    def __init__(self, edges, tie_breaker=None, ballot_notation=None):
+    def __init__(self, edges, tie_breaker=None, ballot_notation=None, candidates=None):
         self.edges = edges
+        self.edge_candidates = candidates
         super(SchulzeMethodByGraph, self).__init__([], tie_breaker=tie_breaker, ballot_notation=ballot_notation)
 
+    # Candidates are read off the edges unless given, as they must be when
+    # there is only one
     def standardize_ballots(self, ballots, ballot_notation):
         self.ballots = []
-        self.candidates = set([edge[0] for edge, weight in self.edges.items()]) | set([edge[1] for edge, weight in self.edges.items()])
-
-    def ballots_into_graph(self, candidates, ballots):
-        graph = digraph()
-        graph.add_nodes(candidates)
-        for edge in self.edges.items():
-            graph.add_edge(edge[0], edge[1])
-        return graph
+        if self.edge_candidates is not None:
+            self.candidates = set(self.edge_candidates)
+        else:
+            self.candidates = set([edge[0] for edge, weight in self.edges.items()]) | set([edge[1] for edge, weight in self.edges.items()])
+
+    def ballots_into_pairs(self):
+        return dict(self.edges)
 
 # This class provides Schulze NPR results, but bypasses ballots and uses preference tallies instead.
 
@@ -13,19 +13,27 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from pygraph.algorithms.accessibility import accessibility, mutual_accessibility
-from pygraph.classes.digraph import digraph
-from pygraph.algorithms.minmax import maximum_flow
 from .condorcet import CondorcetHelper
-from .common_functions import matching_keys, unique_permutations
+from .digraph import Digraph
+from .instrumentation import count, timed
+from .common_functions import matching_keys
+from concurrent.futures import Executor
+import functools
+import itertools
+import numpy
+import os
 
 PREFERRED_LESS = 1
 PREFERRED_SAME = 2
 PREFERRED_MORE = 3
-STRENGTH_TOLERANCE = 0.0000000001
 STRENGTH_THRESHOLD = 0.1
-NODE_SINK = -1
-NODE_SOURCE = -2
+
+# Number of chunks handed to each worker when vote managements are computed
+# in parallel, which evens out the uneven cost of individual chunks
+CHUNKS_PER_WORKER = 4
+
+# Number of committee sizes whose pattern tables are kept in memory
+PATTERN_CACHE_SIZE = 16
 
 # This class implements the Schulze Method (aka the beatpath method)
 
@@ -36,75 +44,137 @@ class SchulzeHelper(CondorcetHelper):
         self.schwartz_set_heuristic()
 
     def schwartz_set_heuristic(self):
+        self.actions = self.schwartz_set_actions(self.graph)
+        self.graph_winner()
 
-        # Iterate through using the Schwartz set heuristic
-        self.actions = []
-        while len(self.graph.edges()) > 0:
-            access = accessibility(self.graph)
-            mutual_access = mutual_accessibility(self.graph)
-            candidates_to_remove = set()
-            for candidate in self.graph.nodes():
-                candidates_to_remove |= (set(access[candidate]) - set(mutual_access[candidate]))
+    # Iterate through using the Schwartz set heuristic, reducing the graph to
+    # its potential winners and returning the steps taken
+    @staticmethod
+    @timed("schwartz_set_heuristic")
+    def schwartz_set_actions(graph):
+        actions = []
+        while len(graph.edges()) > 0:
+            count("schwartz_steps")
 
-            # Remove nodes at the end of non-cycle paths
+            # Remove nodes at the end of non-cycle paths, which can be reached
+            # from outside their strongly connected component
+            candidates_to_remove = graph.dominated_nodes()
             if len(candidates_to_remove) > 0:
-                self.actions.append({'nodes': candidates_to_remove})
+                actions.append({'nodes': candidates_to_remove})
                 for candidate in candidates_to_remove:
-                    self.graph.del_node(candidate)
+                    graph.del_node(candidate)
 
             # If none exist, remove the weakest edges
             else:
-                edge_weights = self.edge_weights(self.graph)
-                self.actions.append({'edges': matching_keys(edge_weights, min(edge_weights.values()))})
-                for edge in self.actions[-1]["edges"]:
-                    self.graph.del_edge(edge)
+                edge_weights = CondorcetHelper.edge_weights(graph)
+                actions.append({'edges': matching_keys(edge_weights, min(edge_weights.values()))})
+                for edge in actions[-1]["edges"]:
+                    graph.del_edge(edge)
+        return actions
 
-        self.graph_winner()
+    # Finds the nodes outside the Schwartz set of a graph given by its edges.
+    # Nodes without edges are left out, as they are in the Schwartz set.
+    @staticmethod
+    def dominated_nodes(edges):
+        graph = Digraph()
+        for edge in edges:
+            for node in edge:
+                if node not in graph:
+                    graph.add_node(node)
+            if not graph.has_edge(edge):
+                graph.add_edge(edge)
+        return graph.dominated_nodes()
+
+    # Computes p[i][j], the strength of the strongest path from candidate i to
+    # candidate j, through a vectorized Floyd-Warshall over the widest paths
+    # of the graph of strong pairs. This takes O(C^3) time overall.
+    @staticmethod
+    def strongest_path_matrix(candidates, strong_pairs):
+        index = dict((candidate, i) for i, candidate in enumerate(candidates))
+        weights = numpy.array(list(strong_pairs.values()) or [0])
+        paths = numpy.zeros((len(candidates), len(candidates)), dtype=weights.dtype)
+        for (candidate_from, candidate_to), weight in strong_pairs.items():
+            paths[index[candidate_from], index[candidate_to]] = weight
+        return SchulzeHelper.widest_paths(paths)
+
+    # Computes the widest paths of a matrix of edge weights, where a weight of
+    # zero stands for a missing edge
+    @staticmethod
+    def widest_paths(weights):
+        paths = weights
+        for k in range(len(paths)):
+            paths = numpy.maximum(paths, numpy.minimum(paths[:, k, numpy.newaxis], paths[numpy.newaxis, k, :]))
+        paths = numpy.array(paths)
+        numpy.fill_diagonal(paths, 0)
+        return paths
+
+    # Candidates whose strongest paths are at least as strong as those of
+    # every opponent are the potential Schulze winners
+    @staticmethod
+    def strongest_path_winners(candidates, paths):
+        return set([
+            candidates[i]
+            for i in numpy.flatnonzero((paths >= paths.T).all(axis=1)).tolist()
+        ])
 
-    def generate_vote_management_graph(self):
-        self.vote_management_graph = digraph()
-        self.vote_management_graph.add_nodes(self.completed_patterns)
-        self.vote_management_graph.del_node(tuple([PREFERRED_MORE] * self.required_winners))
-        self.pattern_nodes = self.vote_management_graph.nodes()
-        self.vote_management_graph.add_nodes([NODE_SOURCE, NODE_SINK])
-        for pattern_node in self.pattern_nodes:
-            self.vote_management_graph.add_edge((NODE_SOURCE, pattern_node))
-        for i in range(self.required_winners):
-            self.vote_management_graph.add_node(i)
-        for pattern_node in self.pattern_nodes:
-            for i in range(self.required_winners):
-                if pattern_node[i] == 1:
-                    self.vote_management_graph.add_edge((pattern_node, i))
-        for i in range(self.required_winners):
-            self.vote_management_graph.add_edge((i, NODE_SINK))
+    # Orders the candidates into groups by the number of opponents they beat
+    # through their strongest paths, which yields the full Schulze ranking
+    @staticmethod
+    def strongest_path_ranking(candidates, paths):
+        beats = (paths > paths.T).sum(axis=1).tolist()
+        ranking = []
+        for wins in sorted(set(beats), reverse=True):
+            ranking.append(set(candidates[i] for i in range(len(candidates)) if beats[i] == wins))
+        return ranking
+
+    # Computes the strength of the vote management of each (candidate,
+    # other_candidates) task, returning them in the order of the tasks. Given
+    # an Executor, or a number of worker processes, the tasks are split into
+    # chunks that run in parallel, each on its own vote management graph.
+    def vote_management_strengths(self, tasks, executor=None):
+        if executor is None or executor == 1:
+            return [
+                self.strength_of_vote_management(self.proportional_completion(candidate, other_candidates))
+                for candidate, other_candidates in tasks
+            ]
+
+        # Pools report their size as _max_workers, other executors are taken
+        # to use every processor
+        if isinstance(executor, Executor):
+            workers = getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+            return self.vote_management_chunks(tasks, executor, workers)
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=executor) as pool:
+            return self.vote_management_chunks(tasks, pool, executor)
+
+    def vote_management_chunks(self, tasks, executor, workers):
+        tasks = list(tasks)
+        chunk_size = max(1, -(-len(tasks) // (workers * CHUNKS_PER_WORKER)))
+        futures = [
+            executor.submit(strengths_of_vote_management, self.profile, self.required_winners, tasks[start:start + chunk_size])
+            for start in range(0, len(tasks), chunk_size)
+        ]
+        strengths = []
+        for future in futures:
+            strengths.extend(future.result())
+        return strengths
 
     # Generates a list of all patterns that do not contain indifference
     def generate_completed_patterns(self):
-        self.completed_patterns = []
-        for i in range(0, self.required_winners + 1):
-            for pattern in unique_permutations(
-                    [PREFERRED_LESS] * (self.required_winners - i)
-                    + [PREFERRED_MORE] * (i)
-            ):
-                self.completed_patterns.append(tuple(pattern))
+        table = pattern_table(self.required_winners)
+        self.completed_patterns = table.patterns
+        self.completed_pattern_masks = table.masks
 
+    @timed("proportional_completion", "proportional_completions")
     def proportional_completion(self, candidate, other_candidates):
         profile = dict(list(zip(self.completed_patterns, [0] * len(self.completed_patterns))))
 
         # Obtain an initial tally from the ballots
-        for ballot in self.ballots:
-            pattern = []
-            for other_candidate in other_candidates:
-                if ballot["ballot"][candidate] < ballot["ballot"][other_candidate]:
-                    pattern.append(PREFERRED_LESS)
-                elif ballot["ballot"][candidate] == ballot["ballot"][other_candidate]:
-                    pattern.append(PREFERRED_SAME)
-                else:
-                    pattern.append(PREFERRED_MORE)
-            pattern = tuple(pattern)
-            if pattern not in profile:
-                profile[pattern] = 0.0
-            profile[pattern] += ballot["count"]
+        for pattern, tally in self.pattern_tallies(candidate, other_candidates):
+            if pattern in profile:
+                profile[pattern] += tally
+            else:
+                profile[pattern] = 0.0 + tally
         weight_sum = sum(profile.values())
 
         # Peel off patterns with indifference (from the most to the least) and apply proportional completion to them
@@ -123,6 +193,27 @@ class SchulzeHelper(CondorcetHelper):
 
         return profile
 
+    # Tallies the ballots by the pattern of their preferences between the
+    # candidate and each of the other candidates. The patterns of all ballots
+    # are computed at once from the rank matrix as base 3 codes, so ballots
+    # that agree on these candidates fall into the same bin. Patterns are
+    # returned in the order they first appear among the ballots.
+    def pattern_tallies(self, candidate, other_candidates):
+        index = self.profile.index
+        ranks = self.profile.ranks
+        own = ranks[:, [index[candidate]]]
+        others = ranks[:, [index[other_candidate] for other_candidate in other_candidates]]
+        digits = numpy.where(own > others, PREFERRED_LESS, numpy.where(own == others, PREFERRED_SAME, PREFERRED_MORE)) - 1
+        powers = 3 ** numpy.arange(others.shape[1] - 1, -1, -1, dtype=numpy.int64)
+        codes, first, inverse = numpy.unique(digits @ powers, return_index=True, return_inverse=True)
+        tallies = numpy.bincount(inverse.reshape(-1), weights=self.profile.counts, minlength=len(codes))
+        order = numpy.argsort(first)
+        patterns = (codes[order, numpy.newaxis] // powers) % 3 + 1
+        return zip(
+            [tuple(pattern) for pattern in patterns.tolist()],
+            tallies[order].astype(self.profile.counts.dtype).tolist(),
+        )
+
     def proportional_completion_round(self, completion_pattern, profile):
 
         # Remove pattern that contains indifference
@@ -169,32 +260,78 @@ class SchulzeHelper(CondorcetHelper):
 
         return profile
 
-    # This method converts the voter profile into a capacity graph and iterates
-    # on the maximum flow using the Edmonds Karp algorithm. The end result is
-    # the limit of the strength of the voter management as per Markus Schulze's
-    # Calcul02.pdf (draft, 28 March 2008, abstract: "In this paper we illustrate
-    # the calculation of the strengths of the vote managements.").
+    # The strength of the vote management is the limit reached by iterating on
+    # the maximum flow of the vote management graph, as per Markus Schulze's
+    # Calcul02.pdf. By the max-flow min-cut theorem that limit is the largest
+    # r with N(T) >= r * |T| for every nonempty set T of winner slots, where
+    # N(T) is the weight of the patterns preferring the candidate's rival in at
+    # least one slot of T. It is found directly by tallying N(T) for every T
+    # with a subset-sum transform, which takes O(W * 2^W) time for W winners.
+    @timed("vote_management", "vote_managements")
     def strength_of_vote_management(self, voter_profile):
+        slots = self.required_winners
+        full = (1 << slots) - 1
+        count("vote_management_subsets", full)
+        weights = numpy.array([voter_profile[pattern] for pattern in self.completed_patterns], dtype=numpy.float64)
+
+        # within[S] holds the weight of the patterns whose preferred slots all
+        # lie within S, so N(T) is the total weight less within[~T]
+        within = numpy.bincount(self.completed_pattern_masks, weights=weights, minlength=full + 1)
+        for i in range(slots):
+            within = within.reshape(-1, 2, 1 << i)
+            within[:, 1, :] += within[:, 0, :]
+        within = within.reshape(-1)
+        sizes = pattern_table(slots).slot_counts
+        r = float(((weights.sum() - within[::-1][1:]) / sizes[1:]).min())
+
+        # We expect strengths to be above a specified threshold
+        if r * slots < STRENGTH_THRESHOLD:
+            return 0
+        return round(r, 9)
+
+
+# This class holds the tables shared by every vote management between a
+# candidate and a given number of others: the completed patterns in the order
+# generate_completed_patterns has always listed them, their masks of preferred
+# winner slots and the number of slots in each mask.
+class PatternTable(object):
+
+    def __init__(self, required_winners):
+        self.required_winners = required_winners
+        self.patterns = []
+        for i in range(0, required_winners + 1):
+            self.patterns.extend(sorted(
+                tuple(PREFERRED_MORE if slot in more else PREFERRED_LESS for slot in range(required_winners))
+                for more in itertools.combinations(range(required_winners), i)
+            ))
+        self.patterns = tuple(self.patterns)
+
+        # Encode the winner slots each pattern prefers as the bits of a mask
+        self.masks = numpy.array([
+            sum(1 << i for i in range(required_winners) if pattern[i] == PREFERRED_LESS)
+            for pattern in self.patterns
+        ], dtype=numpy.int64)
+        self.slot_counts = numpy.zeros(1 << required_winners, dtype=numpy.int64)
+        for i in range(required_winners):
+            self.slot_counts[1 << i:2 << i] = self.slot_counts[:1 << i] + 1
+        self.masks.flags.writeable = False
+        self.slot_counts.flags.writeable = False
+
+
+# Pattern tables are built once per committee size and shared process-wide
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def pattern_table(required_winners):
+    return PatternTable(required_winners)
+
+
+# This class holds what a worker needs to compute vote managements on its own
+class VoteManagement(SchulzeHelper):
+
+    def __init__(self, profile, required_winners):
+        self.profile = profile
+        self.required_winners = required_winners
+        self.generate_completed_patterns()
+
 
-        # Initialize the graph weights
-        for pattern in self.pattern_nodes:
-            self.vote_management_graph.set_edge_weight((NODE_SOURCE, pattern), voter_profile[pattern])
-            for i in range(self.required_winners):
-                if pattern[i] == 1:
-                    self.vote_management_graph.set_edge_weight((pattern, i), voter_profile[pattern])
-
-        # Iterate towards the limit
-        r = [(float(sum(voter_profile.values())) - voter_profile[tuple([PREFERRED_MORE] * self.required_winners)]) / self.required_winners]
-        while len(r) < 2 or r[-2] - r[-1] > STRENGTH_TOLERANCE:
-            for i in range(self.required_winners):
-                self.vote_management_graph.set_edge_weight((i, NODE_SINK), r[-1])
-            max_flow = maximum_flow(self.vote_management_graph, NODE_SOURCE, NODE_SINK)
-            sink_sum = sum(v for k, v in max_flow[0].items() if k[1] == NODE_SINK)
-            r.append(sink_sum / self.required_winners)
-
-            # We expect strengths to be above a specified threshold
-            if sink_sum < STRENGTH_THRESHOLD:
-                return 0
-
-        # Return the final max flow
-        return round(r[-1], 9)
+def strengths_of_vote_management(profile, required_winners, tasks):
+    return VoteManagement(profile, required_winners).vote_management_strengths(tasks)
@@ -19,6 +19,7 @@ from .condorcet import CondorcetSystem
 
 # This class implements the Schulze Method (aka the beatpath method)
 class SchulzeMethod(CondorcetSystem, SchulzeHelper):
+    LAZY_RESULTS = CondorcetSystem.LAZY_RESULTS + ("strongest_paths", "ranking", "actions")
 
     def __init__(self, ballots, tie_breaker=None, ballot_notation=None):
         super(SchulzeMethod, self).__init__(
@@ -27,6 +28,27 @@ class SchulzeMethod(CondorcetSystem, SchulzeHelper):
             ballot_notation=ballot_notation,
         )
 
+    # Determine the winner from the strongest paths between the candidates.
+    # The Schwartz set heuristic only serves to explain that result, so its
+    # actions are worked out the first time they are asked for.
+    def condorcet_completion_method(self):
+        candidates = list(self.candidates)
+        paths = self.strongest_path_matrix(candidates, self.strong_pairs)
+        self.strongest_paths = self.matrix_into_pairs(candidates, paths)
+        self.ranking = self.strongest_path_ranking(candidates, paths)
+        winning_candidates = self.strongest_path_winners(candidates, paths)
+        if len(winning_candidates) == 1:
+            self.winner = list(winning_candidates)[0]
+        else:
+            self.tied_winners = winning_candidates
+            self.winner = self.break_ties(winning_candidates)
+
+    def __getattr__(self, name):
+        if name == 'actions' and 'strongest_paths' in self.__dict__:
+            self.actions = self.schwartz_set_actions(self.pairs_into_graph(self.candidates, self.strong_pairs))
+            return self.actions
+        return super(SchulzeMethod, self).__getattr__(name)
+
     def as_dict(self):
         data = super(SchulzeMethod, self).as_dict()
         if hasattr(self, 'actions'):
@@ -13,26 +13,64 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .abstract_classes import AbstractOrderingVotingSystem
+from .abstract_classes import OrderingVotingSystem
 from .schulze_helper import SchulzeHelper
-from .schulze_method import SchulzeMethod
+from .tie_breaker import TieBreaker
+from .instrumentation import phase
+import numpy
 
 
 #
-class SchulzeNPR(AbstractOrderingVotingSystem, SchulzeHelper):
+class SchulzeNPR(OrderingVotingSystem, SchulzeHelper):
+    LAZY_RESULTS = OrderingVotingSystem.LAZY_RESULTS + ("rounds",)
 
     def __init__(self, ballots, winner_threshold=None, tie_breaker=None, ballot_notation=None):
         self.standardize_ballots(ballots, ballot_notation)
         super(SchulzeNPR, self).__init__(
             self.ballots,
-            single_winner_class=SchulzeMethod,
             winner_threshold=winner_threshold,
             tie_breaker=tie_breaker,
         )
 
-    @staticmethod
-    def ballots_without_candidate(ballots, candidate):
-        for ballot in ballots:
-            if candidate in ballot['ballot']:
-                del ballot['ballot'][candidate]
-        return ballots
+    # Each round is a Schulze election among the remaining candidates. Removing
+    # a candidate from every ballot leaves the pairwise tallies between the
+    # others untouched, so the pairwise matrix is built once and each round
+    # only restricts it to the candidates still in the running.
+    def calculate_results(self):
+        candidates = list(self.profile.candidates)
+        with phase("pairwise"):
+            matrix = self.profile.pairwise_matrix()
+        self.order = []
+        self.rounds = []
+        remaining = list(range(len(candidates)))
+        while len(remaining) > 1 and (self.winner_threshold is None or len(self.order) < self.winner_threshold):
+            winning_candidates = self.round_winners(candidates, matrix[numpy.ix_(remaining, remaining)], remaining)
+            if len(winning_candidates) == 1:
+                r = {'winner': list(winning_candidates)[0]}
+            else:
+                if self.tie_breaker is None:
+                    self.tie_breaker = TieBreaker(set(candidates[i] for i in remaining))
+                r = {'winner': self.tie_breaker.break_ties(winning_candidates), 'tied_winners': winning_candidates}
+            self.order.append(r['winner'])
+            self.rounds.append(r)
+            remaining.remove(candidates.index(r['winner']))
+
+        # Note the last remaining candidate
+        if (self.winner_threshold is None or len(self.order) < self.winner_threshold):
+            r = {'winner': candidates[remaining[0]]}
+            self.order.append(r['winner'])
+            self.rounds.append(r)
+
+    # Finds the potential winners among the remaining candidates as
+    # SchulzeMethod would, preferring unbeaten candidates over strongest paths
+    def round_winners(self, candidates, matrix, remaining):
+        weights = numpy.where(matrix > matrix.T, matrix, 0)
+        winning_candidates = set(candidates[remaining[i]] for i in numpy.flatnonzero(~(weights > 0).any(axis=0)).tolist())
+        if len(winning_candidates) == 0:
+            winning_candidates = self.strongest_path_winners([candidates[i] for i in remaining], self.widest_paths(weights))
+        return winning_candidates
+
+    def as_dict(self):
+        data = super(SchulzeNPR, self).as_dict()
+        data["rounds"] = self.rounds
+        return data
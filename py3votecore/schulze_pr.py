@@ -17,12 +17,14 @@
 # in schulze2.pdf
 from .schulze_helper import SchulzeHelper
 from .abstract_classes import OrderingVotingSystem
-from pygraph.classes.digraph import digraph
+from .digraph import Digraph
 
 
 class SchulzePR(OrderingVotingSystem, SchulzeHelper):
+    LAZY_RESULTS = OrderingVotingSystem.LAZY_RESULTS + ("rounds",)
 
-    def __init__(self, ballots, tie_breaker=None, winner_threshold=None, ballot_notation=None):
+    def __init__(self, ballots, tie_breaker=None, winner_threshold=None, ballot_notation=None, executor=None):
+        self.executor = executor
         self.standardize_ballots(ballots, ballot_notation)
         super(SchulzePR, self).__init__(
             self.ballots,
@@ -45,22 +47,23 @@ class SchulzePR(OrderingVotingSystem, SchulzeHelper):
 
             # Generate the list of patterns we need to complete
             self.generate_completed_patterns()
-            self.generate_vote_management_graph()
-
-            # Generate the edges between nodes
-            self.graph = digraph()
-            self.graph.add_nodes(remaining_candidates)
+            self.graph = Digraph(remaining_candidates)
             self.winners = set([])
             self.tied_winners = set([])
 
             # Generate the edges between nodes
-            for candidate_from in remaining_candidates:
-                other_candidates = sorted(list(remaining_candidates - set([candidate_from])))
-                for candidate_to in other_candidates:
-                    completed = self.proportional_completion(candidate_from, set([candidate_to]) | set(self.order))
-                    weight = self.strength_of_vote_management(completed)
-                    if weight > 0:
-                        self.graph.add_edge((candidate_to, candidate_from), weight)
+            edges = [
+                (candidate_to, candidate_from)
+                for candidate_from in remaining_candidates
+                for candidate_to in sorted(list(remaining_candidates - set([candidate_from])))
+            ]
+            weights = self.vote_management_strengths([
+                (candidate_from, sorted(set([candidate_to]) | set(self.order)))
+                for candidate_to, candidate_from in edges
+            ], self.executor)
+            for edge, weight in zip(edges, weights):
+                if weight > 0:
+                    self.graph.add_edge(edge, weight)
 
             # Determine the round winner through the Schwartz set heuristic
             self.schwartz_set_heuristic()
@@ -15,14 +15,21 @@
 
 # This class implements Schulze STV, a proportional representation system
 from .abstract_classes import MultipleWinnerVotingSystem
-from .schulze_helper import SchulzeHelper
-from pygraph.classes.digraph import digraph
+from .schulze_helper import SchulzeHelper, STRENGTH_THRESHOLD
+from .digraph import Digraph
+from .instrumentation import record
 import itertools
 
+# Slack allowed between a computed strength and its upper bound
+BOUND_TOLERANCE = 0.000001
+
 
 class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
+    LAZY_RESULTS = MultipleWinnerVotingSystem.LAZY_RESULTS + ("actions",)
 
-    def __init__(self, ballots, tie_breaker=None, required_winners=1, ballot_notation=None):
+    def __init__(self, ballots, tie_breaker=None, required_winners=1, ballot_notation=None, executor=None, pruned=False):
+        self.executor = executor
+        self.pruned = pruned
         self.standardize_ballots(ballots, ballot_notation)
         super(SchulzeSTV, self).__init__(self.ballots, tie_breaker=tie_breaker, required_winners=required_winners)
 
@@ -35,22 +42,31 @@ class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
 
         # Generate the list of patterns we need to complete
         self.generate_completed_patterns()
-        self.generate_vote_management_graph()
+
+        # List the vote managements behind the edges between nodes
+        tasks = [
+            (candidate, sorted(set(candidate_set) - set([candidate])))
+            for candidate_set in itertools.combinations(self.candidates, self.required_winners + 1)
+            for candidate in candidate_set
+        ]
+        if self.pruned or self.__dict__.get("lazy"):
+            weights = self.pruned_strengths(tasks)
+            if weights is None:
+                self.actions_pending = not self.pruned
+                return
+        else:
+            weights = self.vote_management_strengths(tasks, self.executor)
 
         # Build the graph of possible winners
-        self.graph = digraph()
+        self.graph = Digraph()
         for candidate_set in itertools.combinations(self.candidates, self.required_winners):
-            self.graph.add_nodes([tuple(sorted(list(candidate_set)))])
+            self.graph.add_node(tuple(sorted(list(candidate_set))))
 
         # Generate the edges between nodes
-        for candidate_set in itertools.combinations(self.candidates, self.required_winners + 1):
-            for candidate in candidate_set:
-                other_candidates = sorted(set(candidate_set) - set([candidate]))
-                completed = self.proportional_completion(candidate, other_candidates)
-                weight = self.strength_of_vote_management(completed)
-                if weight > 0:
-                    for subset in itertools.combinations(other_candidates, len(other_candidates) - 1):
-                        self.graph.add_edge((tuple(other_candidates), tuple(sorted(list(subset) + [candidate]))), weight)
+        for (candidate, other_candidates), weight in zip(tasks, weights):
+            if weight > 0:
+                for subset in itertools.combinations(other_candidates, len(other_candidates) - 1):
+                    self.graph.add_edge(self.committee_edge(candidate, other_candidates, subset), weight)
 
         # Determine the winner through the Schwartz set heuristic
         self.graph_winner()
@@ -59,6 +75,73 @@ class SchulzeSTV(MultipleWinnerVotingSystem, SchulzeHelper):
         self.winners = set(self.winner)
         del self.winner
 
+    @staticmethod
+    def committee_edge(candidate, other_candidates, subset):
+        return (tuple(other_candidates), tuple(sorted(list(subset) + [candidate])))
+
+    # Computes the strengths of the vote managements from the strongest
+    # possible down, skipping the graph of every committee where it can. The
+    # strength between a candidate and others can't exceed the number of
+    # voters who don't prefer the candidate to each of the others, so once all
+    # vote managements that could be stronger than some bound are known, so
+    # are all edges above that bound. A committee outside the Schwartz set of
+    # those edges is outside the Schwartz set the heuristic ends with, so if a
+    # single committee remains it wins outright and no further strengths (or
+    # actions) are needed. Otherwise, returns every strength in task order.
+    def pruned_strengths(self, tasks):
+        index = self.profile.index
+        matrix = self.profile.pairwise_matrix().tolist()
+        voters = self.profile.counts.sum().tolist()
+        bounds = {}
+        for i, (candidate, other_candidates) in enumerate(tasks):
+            bound = min(voters - matrix[index[candidate]][index[other_candidate]] for other_candidate in other_candidates)
+            bounds.setdefault(bound, []).append(i)
+
+        weights = [0] * len(tasks)
+        pending, known_edges = [], []
+        committees = len(list(itertools.combinations(self.candidates, self.required_winners)))
+        dominated = set()
+        levels = sorted(bounds, reverse=True)
+        for level, bound in enumerate(levels):
+
+            # Vote managements this weak fall below the threshold
+            if (bound + BOUND_TOLERANCE) * self.required_winners < STRENGTH_THRESHOLD:
+                break
+            group = bounds[bound]
+            for i, weight in zip(group, self.vote_management_strengths([tasks[i] for i in group], self.executor)):
+                weights[i] = weight
+                if weight > 0:
+                    candidate, other_candidates = tasks[i]
+                    for subset in itertools.combinations(other_candidates, len(other_candidates) - 1):
+                        pending.append((weight, self.committee_edge(candidate, other_candidates, subset)))
+
+            # Prune the committees beaten through edges stronger than any
+            # vote management still unknown
+            if level + 1 < len(levels):
+                known = levels[level + 1] + BOUND_TOLERANCE
+                confirmed = [edge for weight, edge in pending if weight > known]
+                if not confirmed:
+                    continue
+                known_edges.extend(confirmed)
+                pending = [(weight, edge) for weight, edge in pending if weight <= known]
+                dominated |= self.dominated_nodes(known_edges)
+                if committees - len(dominated) == 1:
+                    for candidate_set in itertools.combinations(self.candidates, self.required_winners):
+                        if tuple(sorted(candidate_set)) not in dominated:
+                            self.winners = set(candidate_set)
+                    return None
+        return weights
+
+    # A lazy count stops as soon as the winners are known, as a pruned one
+    # does, and only counts in full if the actions are asked for
+    def __getattr__(self, name):
+        if name == "actions" and self.__dict__.pop("actions_pending", False):
+            self.lazy = False
+            del self.winners
+            record(self.calculate_results, self)
+            return self.actions
+        return super(SchulzeSTV, self).__getattr__(name)
+
     def as_dict(self):
         data = super(SchulzeSTV, self).as_dict()
         if hasattr(self, 'actions'):
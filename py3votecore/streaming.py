@@ -0,0 +1,176 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from .ballot_profile import BallotProfile, RANK_DTYPE, UNRANKED
+from .condorcet import CondorcetHelper
+import numpy
+import itertools
+import json
+import csv
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+# Splits an iterable into lists of at most size items
+def chunked(iterable, size=DEFAULT_CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Reads one ballot per line. Each line holds either a {"count", "ballot"}
+# object or a bare ballot.
+def read_jsonl(source):
+    with _open(source) as lines:
+        for line in lines:
+            if line.strip():
+                ballot = json.loads(line)
+                if not isinstance(ballot, dict) or "ballot" not in ballot:
+                    ballot = {"ballot": ballot}
+                yield ballot
+
+
+# Reads one ordering of candidates per row, most preferred first. If counted
+# is set, the first column of each row holds the ballot count.
+def read_csv(source, counted=False):
+    with _open(source) as lines:
+        for row in csv.reader(lines):
+            row = [field.strip() for field in row]
+            if counted:
+                if not row or not row[0]:
+                    continue
+                count, row = float(row[0]), row[1:]
+                yield {"count": int(count) if count.is_integer() else count, "ballot": [field for field in row if field]}
+            elif any(row):
+                yield {"ballot": [field for field in row if field]}
+
+
+def _open(source):
+    if isinstance(source, str):
+        return open(source, newline="")
+    return _Unclosed(source)
+
+
+class _Unclosed(object):
+
+    def __init__(self, source):
+        self.source = source
+
+    def __enter__(self):
+        return self.source
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+# This class consumes ballots in bounded-size chunks and folds each chunk into
+# the sufficient statistics the voting systems need, so memory use depends on
+# the number of candidates (and distinct ballots, if tracked) rather than on
+# the number of voters.
+class BallotStream(object):
+
+    def __init__(self, ballot_notation=None, candidates=None, chunk_size=DEFAULT_CHUNK_SIZE, track_distinct=True):
+        self.ballot_notation = ballot_notation
+        self.chunk_size = chunk_size
+        self.candidates = []
+        self.voters = 0
+        self.mentions = numpy.zeros(0, dtype=numpy.int64)
+        self.first_preference_counts = numpy.zeros(0, dtype=numpy.int64)
+        self.position_sums = numpy.zeros(0, dtype=numpy.int64)
+        self.matrix = numpy.zeros((0, 0), dtype=numpy.int64)
+        self.distinct = dict() if track_distinct else None
+        self.add_candidates(candidates or [])
+
+    def add_candidates(self, candidates):
+        new_candidates = [candidate for candidate in candidates if candidate not in self.candidates]
+        if not new_candidates:
+            return
+        old, new = len(self.candidates), len(self.candidates) + len(new_candidates)
+        self.candidates.extend(new_candidates)
+        self.first_preference_counts = numpy.concatenate([self.first_preference_counts, numpy.zeros(new - old, dtype=self.first_preference_counts.dtype)])
+        self.position_sums = numpy.concatenate([self.position_sums, numpy.zeros(new - old, dtype=self.position_sums.dtype)])
+        matrix = numpy.zeros((new, new), dtype=self.matrix.dtype)
+        matrix[:old, :old] = self.matrix
+
+        # Ballots already seen left the new candidates unranked
+        matrix[:old, old:] = self.mentions[:, numpy.newaxis]
+        self.matrix = matrix
+        self.mentions = numpy.concatenate([self.mentions, numpy.zeros(new - old, dtype=self.mentions.dtype)])
+
+    def consume(self, ballots):
+        for chunk in chunked(ballots, self.chunk_size):
+            self.add_profile(BallotProfile.from_ballots(chunk, self.ballot_notation, candidates=self.candidates))
+        return self
+
+    def add_profile(self, profile):
+        self.add_candidates(profile.candidates)
+        columns = numpy.array([self.candidates.index(candidate) for candidate in profile.candidates], dtype=numpy.intp)
+        counts = profile.counts
+        self.upcast(counts.dtype)
+
+        ranked = profile.ranks != UNRANKED
+        self.voters += counts.sum().tolist()
+        self.mentions[columns] += counts @ ranked
+        self.first_preference_counts[columns] += counts @ (profile.ranks == 0)
+        self.position_sums[columns] += counts @ numpy.where(ranked, profile.ranks, 0)
+        self.matrix[numpy.ix_(columns, columns)] += profile.pairwise_matrix()
+
+        # Candidates absent from this chunk were unranked on all of its ballots
+        absent = numpy.setdiff1d(numpy.arange(len(self.candidates)), columns)
+        if len(absent):
+            self.matrix[numpy.ix_(columns, absent)] += (counts @ ranked)[:, numpy.newaxis]
+
+        if self.distinct is not None:
+            for row, count in zip(profile.ranks.tolist(), counts.tolist()):
+                key = tuple((self.candidates[columns[i]], rank) for i, rank in enumerate(row) if rank != UNRANKED)
+                self.distinct[key] = self.distinct.get(key, 0) + count
+
+    def upcast(self, dtype):
+        dtype = numpy.result_type(self.matrix.dtype, dtype)
+        if dtype != self.matrix.dtype:
+            self.mentions = self.mentions.astype(dtype)
+            self.first_preference_counts = self.first_preference_counts.astype(dtype)
+            self.position_sums = self.position_sums.astype(dtype)
+            self.matrix = self.matrix.astype(dtype)
+
+    # Ballots ranking each candidate anywhere, as tallied by PluralityAtLarge
+    def tallies(self):
+        return dict(zip(self.candidates, self.mentions.tolist()))
+
+    def first_preferences(self):
+        return dict(zip(self.candidates, self.first_preference_counts.tolist()))
+
+    # Borda scores of ordered ballots, as tallied by BordaAtLarge
+    def borda_scores(self):
+        scores = (len(self.candidates) - 1) * self.mentions - self.position_sums
+        return dict(zip(self.candidates, scores.tolist()))
+
+    # Pairwise tallies suitable for SchulzeMethodByGraph or SchulzeNPRByGraph
+    def pairs(self):
+        return CondorcetHelper.matrix_into_pairs(self.candidates, self.matrix)
+
+    # The distinct ballots seen so far, as a profile any voting system accepts
+    def profile(self):
+        if self.distinct is None:
+            raise Exception("Distinct ballots were not tracked")
+        ranks = numpy.full((len(self.distinct), len(self.candidates)), UNRANKED, dtype=RANK_DTYPE)
+        index = dict((candidate, i) for i, candidate in enumerate(self.candidates))
+        for row, key in zip(ranks, self.distinct):
+            for candidate, rank in key:
+                row[index[candidate]] = rank
+        return BallotProfile(self.candidates, ranks, list(self.distinct.values()))
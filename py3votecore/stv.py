@@ -15,26 +15,45 @@
 
 from .abstract_classes import MultipleWinnerVotingSystem
 from collections import defaultdict
-from .common_functions import matching_keys
-import copy
+from .instrumentation import count
+from decimal import Decimal
 import math
 
+# Floating point tallies within this fraction of each other are taken to be
+# equal, since fractional transfers summed in a different order can round
+# differently
+TALLY_TOLERANCE = 1e-9
+
 
 # This class implements the Single Transferable vote (aka STV) in its most
 # classic form (see http://en.wikipedia.org/wiki/Single_transferable_vote).
 # Alternate counting methods such as Meek's and Warren's would be nice, but
 # would need to be covered in a separate class.
+#
+# Given a number of decimal places, ballot weights are kept as integers scaled
+# by that power of ten and transferred surpluses are truncated to it, as many
+# statutory rules require. Tallies are then reported as Decimals, and the
+# count no longer depends on floating point rounding. Otherwise tallies are
+# floats, compared with the quota and with each other up to TALLY_TOLERANCE.
 class STV(MultipleWinnerVotingSystem):
+    LAZY_RESULTS = MultipleWinnerVotingSystem.LAZY_RESULTS + ("quota", "rounds", "remaining_candidates")
 
-    def __init__(self, ballots, tie_breaker=None, required_winners=1):
+    def __init__(self, ballots, tie_breaker=None, required_winners=1, decimal_places=None):
+        self.decimal_places = decimal_places
+        self.scale = 1 if decimal_places is None else 10 ** decimal_places
         super(STV, self).__init__(ballots, tie_breaker=tie_breaker, required_winners=required_winners)
 
     def calculate_results(self):
 
         self.candidates = set()
         for ballot in self.ballots:
-            ballot["count"] = float(ballot["count"])
             self.candidates.update(ballot["ballot"])
+        if self.decimal_places is None:
+            for ballot in self.ballots:
+                ballot["count"] = float(ballot["count"])
+            weights = None
+        else:
+            weights = [int(Decimal(str(ballot["count"])).scaleb(self.decimal_places)) for ballot in self.ballots]
         if len(self.candidates) < self.required_winners:
             raise Exception("Not enough candidates provided")
 
@@ -42,7 +61,7 @@ class STV(MultipleWinnerVotingSystem):
         self.rounds = []
         self.winners = set()
         quota = self.quota
-        ballots = copy.deepcopy(self.ballots)
+        piles = BallotPiles(self.ballots, weights=weights)
         remaining_candidates = self.candidates - self.winners
 
         # Loop until we have enough candidates
@@ -54,45 +73,51 @@ class STV(MultipleWinnerVotingSystem):
 
             # If all the votes have been used up, start from scratch for the remaining candidates
             round = {}
-            if len([ballot for ballot in ballots if ballot["count"] > 0 and ballot["ballot"]]) == 0:
+            if piles.live == 0:
                 remaining_candidates = self.candidates - self.winners
                 round["note"] = "reset"
-                ballots = copy.deepcopy(self.ballots)
-                for ballot in ballots:
-                    ballot["ballot"] = [x for x in ballot["ballot"] if x in remaining_candidates]
-                quota = STV.droop_quota(ballots, self.required_winners - len(self.winners))
+                piles = BallotPiles(self.ballots, excluded=self.winners, weights=weights)
+                if self.decimal_places is None:
+                    quota = STV.droop_quota_of_voters(piles.voters, self.required_winners - len(self.winners))
+                else:
+                    quota = piles.voters // (self.scale * (self.required_winners - len(self.winners) + 1)) + 1
 
-            round["tallies"] = self.tallies(ballots)
-            if round["tallies"]:
+            # Tallies are compared in scaled units
+            tallies = dict(piles.totals)
+            round["tallies"] = self.unscaled(tallies)
+            if tallies:
 
                 # If any candidates meet or exceeds the quota, they're a winner
-                if max(round["tallies"].values()) >= quota:
+                if self.reaches(max(tallies.values()), quota):
 
                     # Collect candidates as winners
                     round["winners"] = set([
                         candidate
-                        for candidate, tally in list(round["tallies"].items())
-                        if tally >= self.quota
+                        for candidate, tally in list(tallies.items())
+                        if self.reaches(tally, self.quota)
                     ])
                     self.winners |= round["winners"]
                     remaining_candidates -= round["winners"]
 
                     # Redistribute excess votes
-                    for ballot in ballots:
-                        if ballot["ballot"] and ballot["ballot"][0] in round["winners"]:
-                            ballot["count"] *= (round["tallies"][ballot["ballot"][0]] - self.quota) / round["tallies"][ballot["ballot"][0]]
+                    for candidate in round["winners"]:
+                        if self.decimal_places is None:
+                            piles.reweight(candidate, max(0, tallies[candidate] - self.quota) / tallies[candidate])
+                        else:
+                            piles.truncate(candidate, tallies[candidate] - self.quota * self.scale, tallies[candidate])
 
-                    # Remove candidates from remaining ballots
-                    ballots = self.remove_candidates_from_ballots(round["winners"], ballots)
+                    # Transfer the winners' ballots to their next preferences
+                    piles.remove(round["winners"])
 
                 # If no candidate exceeds the quota, elimiate the least preferred
                 else:
-                    round.update(self.loser(round["tallies"]))
+                    round.update(self.loser(tallies))
                     remaining_candidates.remove(round["loser"])
-                    ballots = self.remove_candidates_from_ballots([round["loser"]], ballots)
+                    piles.remove([round["loser"]])
 
             # Record this round's actions
             self.rounds.append(round)
+            count("stv_rounds")
 
         # Append the final winner and return
         if len(self.winners) < self.required_winners:
@@ -107,8 +132,22 @@ class STV(MultipleWinnerVotingSystem):
             data["remaining_candidates"] = self.remaining_candidates
         return data
 
+    def unscaled(self, tallies):
+        if self.decimal_places is None:
+            return tallies
+        return dict((candidate, Decimal(tally).scaleb(-self.decimal_places)) for candidate, tally in tallies.items())
+
+    def tolerance(self, tally):
+        if self.decimal_places is not None:
+            return 0
+        return TALLY_TOLERANCE * max(1, abs(tally))
+
+    def reaches(self, tally, quota):
+        return tally >= quota * self.scale - self.tolerance(quota)
+
     def loser(self, tallies):
-        losers = matching_keys(tallies, min(tallies.values()))
+        lowest = min(tallies.values())
+        losers = set(candidate for candidate, tally in tallies.items() if tally <= lowest + self.tolerance(lowest))
         if len(losers) == 1:
             return {"loser": list(losers)[0]}
         else:
@@ -117,12 +156,14 @@ class STV(MultipleWinnerVotingSystem):
                 "loser": self.break_ties(losers, True)
             }
 
+    # Replaces (rather than edits) the candidate lists that mention a removed
+    # candidate, so lists shared with the original ballots are never altered
     @staticmethod
     def remove_candidates_from_ballots(candidates, ballots):
+        candidates = set(candidates)
         for ballot in ballots:
-            for candidate in candidates:
-                if candidate in ballot["ballot"]:
-                    ballot["ballot"].remove(candidate)
+            if not candidates.isdisjoint(ballot["ballot"]):
+                ballot["ballot"] = [candidate for candidate in ballot["ballot"] if candidate not in candidates]
         return ballots
 
     def tallies(self, ballots):
@@ -141,4 +182,79 @@ class STV(MultipleWinnerVotingSystem):
         for ballot in ballots:
             if ballot["ballot"]:
                 voters += ballot["count"]
+        return STV.droop_quota_of_voters(voters, seats)
+
+    @staticmethod
+    def droop_quota_of_voters(voters, seats=1):
         return int(math.floor(voters / (seats + 1)) + 1)
+
+
+# This class keeps, for every ballot, a pointer to its next continuing
+# preference, and for every continuing candidate, the pile of ballots counting
+# towards them along with the pile's running total. Removing a candidate only
+# touches the ballots in that candidate's pile. Weights default to the ballot
+# counts.
+class BallotPiles(object):
+
+    def __init__(self, ballots, excluded=(), weights=None):
+        self.preferences = [ballot["ballot"] for ballot in ballots]
+        self.weights = [ballot["count"] for ballot in ballots] if weights is None else list(weights)
+        self.positions = [0] * len(ballots)
+        self.excluded = set(excluded)
+        self.piles = dict()
+        self.totals = dict()
+        for preferences in self.preferences:
+            for candidate in preferences:
+                if candidate not in self.excluded and candidate not in self.piles:
+                    self.piles[candidate] = []
+                    self.totals[candidate] = 0
+
+        # Voters still expressing a preference, and the ballots among them that
+        # still carry some weight
+        self.voters = 0
+        self.live = 0
+        for i in range(len(self.preferences)):
+            if self.advance(i):
+                self.voters += self.weights[i]
+
+    # Moves a ballot onto the pile of its next continuing preference
+    def advance(self, i):
+        preferences, position = self.preferences[i], self.positions[i]
+        while position < len(preferences) and preferences[position] in self.excluded:
+            position += 1
+        self.positions[i] = position
+        if position == len(preferences):
+            return False
+        self.piles[preferences[position]].append(i)
+        self.totals[preferences[position]] += self.weights[i]
+        if self.weights[i] > 0:
+            self.live += 1
+        return True
+
+    def reweight(self, candidate, ratio):
+        for i in self.piles[candidate]:
+            if self.weights[i] > 0:
+                self.live -= 1
+            self.weights[i] *= ratio
+            if self.weights[i] > 0:
+                self.live += 1
+
+    # Scales integer weights by surplus / total, truncating each result
+    def truncate(self, candidate, surplus, total):
+        for i in self.piles[candidate]:
+            if self.weights[i] > 0:
+                self.live -= 1
+            self.weights[i] = self.weights[i] * surplus // total
+            if self.weights[i] > 0:
+                self.live += 1
+
+    def remove(self, candidates):
+        self.excluded.update(candidates)
+        for candidate in candidates:
+            del self.totals[candidate]
+            pile = self.piles.pop(candidate)
+            count("stv_transfers", len(pile))
+            for i in pile:
+                if self.weights[i] > 0:
+                    self.live -= 1
+                self.advance(i)
@@ -8,8 +8,8 @@ CHANGES = open(os.path.join(here, 'CHANGES.rst')).read()
 LICENSE = open(os.path.join(here, 'LICENSE.txt')).read()
 
 requires = [
-    'python-graph-core >= 1.8.0',
     'networkx >= 3.0',
+    'numpy >= 1.21',
 ]
 
 setup(name='python3-vote-core',
@@ -28,7 +28,7 @@ setup(name='python3-vote-core',
       url='https://github.com/bradbeattie/python-vote-core',
       license='GPLv3',
       keywords='library election',
-      packages=find_packages(),
+      packages=find_packages(exclude=["benchmarks"]),
       include_package_data=True,
       zip_safe=False,
       install_requires=requires,
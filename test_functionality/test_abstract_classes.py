@@ -0,0 +1,104 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.plurality import Plurality
+from py3votecore.borda_at_large import BordaAtLarge
+from py3votecore.irv import IRV
+from py3votecore.stv import STV
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.ranked_pairs import RankedPairs
+from py3votecore.schulze_stv import SchulzeSTV
+from py3votecore.schulze_npr import SchulzeNPR
+from py3votecore.instrumentation import instrumented
+import random
+import unittest
+
+
+class TestLazyResults(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(24)
+        self.candidates = ["a", "b", "c", "d", "e"]
+        self.input = []
+        for i in range(30):
+            ballot = self.candidates[:]
+            random.shuffle(ballot)
+            self.input.append({"count": random.randint(1, 9), "ballot": ballot[:random.randint(3, 5)]})
+        self.grouped = [{"count": ballot["count"], "ballot": [[candidate] for candidate in ballot["ballot"]]} for ballot in self.input]
+
+    def test_same_results(self):
+
+        # Generate data
+        elections = [
+            (Plurality, [{"count": ballot["count"], "ballot": ballot["ballot"][0]} for ballot in self.input], {}),
+            (BordaAtLarge, self.input, {"required_winners": 2}),
+            (IRV, self.input, {}),
+            (STV, self.input, {"required_winners": 2}),
+            (SchulzeMethod, self.grouped, {"ballot_notation": SchulzeMethod.BALLOT_NOTATION_GROUPING}),
+            (RankedPairs, self.grouped, {"ballot_notation": RankedPairs.BALLOT_NOTATION_GROUPING}),
+            (SchulzeSTV, self.grouped, {"required_winners": 2, "ballot_notation": SchulzeSTV.BALLOT_NOTATION_GROUPING}),
+            (SchulzeNPR, self.grouped, {"ballot_notation": SchulzeNPR.BALLOT_NOTATION_GROUPING}),
+        ]
+
+        # Run tests
+        for system, ballots, options in elections:
+            lazy = system(ballots, tie_breaker=self.candidates, lazy=True, **options)
+            self.assertEqual(lazy.__dict__.get("pending"), True)
+            self.assertEqual(lazy.as_dict(), system(ballots, tie_breaker=self.candidates, **options).as_dict())
+            self.assertNotIn("pending", lazy.__dict__)
+
+    def test_probes(self):
+
+        # Generate data
+        lazy = STV(self.input, required_winners=2, tie_breaker=self.candidates, lazy=True)
+        probes = [hasattr(lazy, "tie_breaker"), hasattr(lazy, "ranking"), hasattr(lazy, "__len__")]
+        pending = lazy.__dict__.get("pending")
+        winners = lazy.winners
+
+        # Run tests
+        self.assertEqual(probes, [True, False, False])
+        self.assertEqual(pending, True)
+        self.assertEqual(winners, STV(self.input, required_winners=2, tie_breaker=self.candidates).winners)
+        self.assertNotIn("pending", lazy.__dict__)
+
+    def test_winners_only(self):
+
+        # Generate data
+        input = [
+            {"count": 60, "ballot": [["a"], ["b"], ["c"], ["d"], ["e"]]},
+            {"count": 45, "ballot": [["a"], ["c"], ["e"], ["b"], ["d"]]},
+            {"count": 30, "ballot": [["b"], ["a"], ["d"], ["e"], ["c"]]},
+            {"count": 12, "ballot": [["e"], ["d"], ["c"], ["b"], ["a"]]},
+        ]
+        eager = SchulzeSTV(input, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING)
+        with instrumented():
+            lazy = SchulzeSTV(input, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING, lazy=True)
+            constructed = lazy.timings["counters"].get("vote_managements", 0)
+            winners = lazy.winners
+            counted = lazy.timings["counters"]["vote_managements"]
+            actions = lazy.actions
+
+        # Run tests
+        self.assertEqual(constructed, 0)
+        self.assertEqual(winners, eager.winners)
+        self.assertLess(counted, lazy.timings["counters"]["vote_managements"])
+        self.assertEqual(actions, eager.actions)
+        self.assertRaises(AttributeError, getattr, lazy, "tied_winners")
+        with self.assertRaisesRegex(AttributeError, "'SchulzeSTV' object has no attribute 'tied_winners'"):
+            eager.tied_winners
+
+
+if __name__ == "__main__":
+    unittest.main()
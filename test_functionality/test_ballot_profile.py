@@ -0,0 +1,151 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.ballot_profile import BallotProfile, UNRANKED
+from py3votecore.ballot_profile import BALLOT_NOTATION_GROUPING, BALLOT_NOTATION_RANKING, BALLOT_NOTATION_RATING
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.stv import STV
+import random
+import unittest
+
+
+class TestBallotProfile(unittest.TestCase):
+
+    def test_notations_agree(self):
+
+        # Generate data
+        grouping = BallotProfile.from_ballots([
+            {"count": 12, "ballot": [["Andrea"], ["Brad", "Carter"]]},
+            {"count": 27, "ballot": [["Brad"]]},
+        ], BALLOT_NOTATION_GROUPING)
+        ranking = BallotProfile.from_ballots([
+            {"count": 12, "ballot": {"Andrea": 1, "Brad": 2, "Carter": 2}},
+            {"count": 27, "ballot": {"Brad": 1}},
+        ], BALLOT_NOTATION_RANKING)
+        rating = BallotProfile.from_ballots([
+            {"count": 12, "ballot": {"Andrea": 10, "Brad": 5, "Carter": 5}},
+            {"count": 27, "ballot": {"Brad": 10}},
+        ], BALLOT_NOTATION_RATING)
+
+        # Run tests
+        for profile in (grouping, ranking, rating):
+            self.assertEqual(profile.candidates, ("Andrea", "Brad", "Carter"))
+            self.assertEqual(profile.ranks.tolist(), [[0, 1, 1], [UNRANKED, 0, UNRANKED]])
+            self.assertEqual(profile.counts.tolist(), [12, 27])
+        self.assertEqual(list(grouping.as_ballots(BALLOT_NOTATION_GROUPING)), [
+            {"count": 12, "ballot": [["Andrea"], ["Brad", "Carter"]]},
+            {"count": 27, "ballot": [["Brad"]]},
+        ])
+
+    def test_orderings(self):
+
+        # Generate data
+        profile = BallotProfile.from_ballots([
+            {"count": 3, "ballot": ["c1", "c2"]},
+            {"ballot": "c3"},
+        ])
+
+        # Run tests
+        self.assertEqual(profile.candidates, ("c1", "c2", "c3"))
+        self.assertEqual(profile.counts.tolist(), [3, 1])
+        self.assertEqual(list(profile.as_ballots()), [
+            {"count": 3, "ballot": ["c1", "c2"]},
+            {"count": 1, "ballot": ["c3"]},
+        ])
+        self.assertRaises(Exception, list, BallotProfile.from_ballots([
+            {"count": 1, "ballot": [["c1", "c2"]]},
+        ], BALLOT_NOTATION_GROUPING).as_ballots())
+
+    def test_aggregation(self):
+
+        # Generate data
+        input = [
+            {"count": 2, "ballot": {"A": 3, "B": 1}},
+            {"count": 1, "ballot": {"C": 1}},
+            {"count": 4, "ballot": {"A": 9, "B": 2}},
+        ]
+        profile = BallotProfile.from_ballots(input, BALLOT_NOTATION_RATING)
+        repeated = BallotProfile(profile.candidates, profile.ranks[[0, 1, 0, 1]], [1, 2, 3, 4])
+
+        # Run tests
+        self.assertEqual(profile.ranks.tolist(), [[0, 1, UNRANKED], [UNRANKED, UNRANKED, 0]])
+        self.assertEqual(profile.counts.tolist(), [6, 1])
+        self.assertEqual(repeated.aggregate().ranks.tolist(), profile.ranks.tolist())
+        self.assertEqual(repeated.aggregate().counts.tolist(), [4, 6])
+
+    def test_pairwise_matrix(self):
+
+        # Generate data
+        random.seed(3)
+        input = []
+        for i in range(200):
+            ballot = dict((candidate, random.randint(1, 4)) for candidate in "ABCDEF" if random.random() < 0.8)
+            input.append({"count": random.randint(1, 5), "ballot": ballot or {"A": 1}})
+        profile = BallotProfile.from_ballots(input, BALLOT_NOTATION_RATING)
+        matrix = profile.pairwise_matrix().tolist()
+
+        # Run tests
+        for i, a in enumerate(profile.candidates):
+            for j, b in enumerate(profile.candidates):
+                self.assertEqual(matrix[i][j], sum(
+                    ballot["count"]
+                    for ballot in input
+                    if ballot["ballot"].get(a, 0) > ballot["ballot"].get(b, 0)
+                ))
+
+    def test_condorcet_input(self):
+
+        # Generate data
+        input = [
+            {"count": 3, "ballot": [["A"], ["C"], ["D"], ["B"]]},
+            {"count": 9, "ballot": [["B"], ["A"], ["C"], ["D"]]},
+            {"count": 8, "ballot": [["C"], ["D"], ["A"], ["B"]]},
+            {"count": 5, "ballot": [["D"], ["A"], ["B"], ["C"]]},
+            {"count": 5, "ballot": [["D"], ["B"], ["C"], ["A"]]}
+        ]
+        profile = BallotProfile.from_ballots(input, BALLOT_NOTATION_GROUPING)
+
+        unranked = BallotProfile.from_ballots(input, BALLOT_NOTATION_GROUPING, candidates=["E"])
+
+        # Run tests
+        self.assertEqual(
+            SchulzeMethod(profile).as_dict(),
+            SchulzeMethod(input, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING).as_dict(),
+        )
+        self.assertIs(SchulzeMethod(profile).profile, profile)
+        self.assertEqual(SchulzeMethod(unranked).profile.candidates, ("A", "C", "D", "B"))
+        self.assertEqual(SchulzeMethod(unranked).as_dict(), SchulzeMethod(profile).as_dict())
+
+    def test_stv_input(self):
+
+        # Generate data
+        input = [
+            {"count": 4, "ballot": ["orange"]},
+            {"count": 2, "ballot": ["pear", "orange"]},
+            {"count": 8, "ballot": ["chocolate", "strawberry"]},
+            {"count": 4, "ballot": ["chocolate", "sweets"]},
+            {"count": 1, "ballot": ["strawberry"]},
+            {"count": 1, "ballot": ["sweets"]}
+        ]
+        profile = BallotProfile.from_ballots(input)
+
+        # Run tests
+        self.assertEqual(
+            STV(profile, required_winners=3).as_dict(),
+            STV(input, required_winners=3).as_dict(),
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.batch import run_batch, stack_elections
+from py3votecore.ballot_profile import UNRANKED, BALLOT_NOTATION_ORDERING
+from py3votecore.plurality import Plurality
+from py3votecore.irv import IRV
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.borda import Borda
+from concurrent.futures import ThreadPoolExecutor
+import random
+import unittest
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(7)
+        self.tie_breaker = ["a", "b", "c", "d", "e"]
+
+    def random_elections(self, notation, count=300):
+        elections = []
+        for i in range(count):
+            candidates = self.tie_breaker[:random.randint(1, 5)]
+            ballots = []
+            for j in range(random.randint(1, 15)):
+                random.shuffle(candidates)
+                ranked = candidates[:random.randint(1, len(candidates))]
+                if notation == "plurality":
+                    ballot = ranked[0]
+                elif notation == "grouping":
+                    ballot = [[candidate] for candidate in ranked]
+                else:
+                    ballot = list(ranked)
+                ballots.append({"count": random.randint(1, 4), "ballot": ballot})
+            elections.append(ballots)
+        return elections
+
+    def test_plurality(self):
+
+        # Generate data
+        input = self.random_elections("plurality")
+        output = run_batch(input, Plurality, tie_breaker=self.tie_breaker)
+
+        # Run tests
+        self.assertEqual(output, [Plurality(ballots, tie_breaker=self.tie_breaker).as_dict() for ballots in input])
+
+    def test_irv(self):
+
+        # Generate data
+        input = self.random_elections("ordering")
+        output = run_batch(input, IRV, tie_breaker=self.tie_breaker)
+
+        # Run tests
+        self.assertEqual(output, [IRV(ballots, tie_breaker=self.tie_breaker).as_dict() for ballots in input])
+
+    def test_schulze_method(self):
+
+        # Generate data
+        input = self.random_elections("grouping")
+        output = run_batch(input, SchulzeMethod, tie_breaker=self.tie_breaker, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING)
+
+        # Run tests
+        self.assertEqual(output, [
+            SchulzeMethod(ballots, tie_breaker=self.tie_breaker, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING).as_dict()
+            for ballots in input
+        ])
+
+    def test_winners_only(self):
+
+        # Generate data
+        grouped = self.random_elections("grouping", 100)
+        plurality = self.random_elections("plurality", 20)
+        output = run_batch(grouped, SchulzeMethod, tie_breaker=self.tie_breaker, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING, winners_only=True)
+        plurality_output = run_batch(plurality, Plurality, tie_breaker=self.tie_breaker, winners_only=True)
+
+        # Run tests
+        self.assertEqual(output, [
+            SchulzeMethod(ballots, tie_breaker=self.tie_breaker, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING).winner
+            for ballots in grouped
+        ])
+        self.assertEqual(plurality_output, [Plurality(ballots, tie_breaker=self.tie_breaker).winner for ballots in plurality])
+
+    def test_mixed_systems(self):
+
+        # Generate data
+        orderings = self.random_elections("ordering", 20)
+        input = [(Borda if i % 2 else IRV, ballots) for i, ballots in enumerate(orderings)]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            output = run_batch(input, executor=executor, tie_breaker=self.tie_breaker)
+
+        # Run tests
+        self.assertEqual(output, [system(ballots, tie_breaker=self.tie_breaker).as_dict() for system, ballots in input])
+
+    def test_stack_elections(self):
+
+        # Generate data
+        input = [
+            [{"count": 2, "ballot": ["x", "y"]}, {"ballot": ["z"]}],
+            [{"count": 5, "ballot": ["q"]}],
+            [{"count": 3, "ballot": ["z", "x", "y"]}],
+        ]
+        groups = stack_elections(input, BALLOT_NOTATION_ORDERING)
+
+        # Run tests
+        self.assertEqual(sorted(groups), [1, 3])
+        self.assertEqual(groups[3].positions, [0, 2])
+        self.assertEqual(groups[3].candidates, [["x", "y", "z"], ["z", "x", "y"]])
+        self.assertEqual(groups[3].ranks.tolist(), [
+            [[0, 1, UNRANKED], [UNRANKED, UNRANKED, 0]],
+            [[0, 1, 2], [UNRANKED, UNRANKED, UNRANKED]],
+        ])
+        self.assertEqual(groups[3].counts.tolist(), [[2, 1], [3, 0]])
+        self.assertEqual(groups[1].candidates, [["q"]])
+
+if __name__ == "__main__":
+    unittest.main()
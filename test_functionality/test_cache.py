@@ -0,0 +1,121 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.cache import ResultCache
+from py3votecore import cache as result_cache
+from py3votecore.plurality import Plurality
+from py3votecore.schulze_stv import SchulzeSTV
+from py3votecore.stv import STV
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import json
+import os
+import tempfile
+import unittest
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.ballots = [
+            {"count": 12, "ballot": {"Andrea": 1, "Brad": 2, "Carter": 3}},
+            {"count": 26, "ballot": {"Andrea": 1, "Carter": 2, "Brad": 3}},
+            {"count": 12, "ballot": {"Andrea": 1, "Carter": 2, "Brad": 3}},
+            {"count": 13, "ballot": {"Carter": 1, "Andrea": 2, "Brad": 3}},
+            {"count": 27, "ballot": {"Brad": 1}},
+        ]
+
+    def test_repeated_elections(self):
+
+        # Generate data
+        cache = ResultCache()
+        reordered = [
+            {"count": 27, "ballot": {"Brad": 1}},
+            {"count": 38, "ballot": {"Brad": 3, "Carter": 2, "Andrea": 1}},
+            {"count": 13, "ballot": {"Carter": 1, "Andrea": 2, "Brad": 3}},
+            {"count": 12, "ballot": {"Andrea": 1, "Brad": 2, "Carter": 3}},
+        ]
+        expected = SchulzeSTV(self.ballots, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_RANKING).as_dict()
+        first = cache.run(SchulzeSTV, self.ballots, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_RANKING)
+        first["winners"].clear()
+        second = cache.run(SchulzeSTV, reordered, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_RANKING, executor=ThreadPoolExecutor(2))
+        other = cache.run(SchulzeSTV, self.ballots, required_winners=1, ballot_notation=SchulzeSTV.BALLOT_NOTATION_RANKING)
+
+        # Run tests
+        self.assertEqual(second, expected)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertNotEqual(other, expected)
+
+    def test_random_tie_breakers(self):
+
+        # Generate data
+        cache = ResultCache()
+        ballots = [{"count": 3, "ballot": "A"}, {"count": 3, "ballot": "B"}, {"count": 1, "ballot": "C"}]
+        for i in range(2):
+            cache.run(Plurality, ballots)
+        for i in range(2):
+            fixed = cache.run(Plurality, ballots, tie_breaker=["B", "A", "C"])
+
+        # Run tests
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(fixed["winner"], "B")
+
+    def test_bounded_entries(self):
+
+        # Generate data
+        cache = ResultCache(max_entries=2)
+        for winners in (1, 2, 3, 1):
+            cache.run(STV, [{"count": 1, "ballot": [candidate]} for candidate in "ABCD"], required_winners=winners, tie_breaker=list("ABCD"))
+
+        # Run tests
+        self.assertEqual(len(cache.entries), 2)
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+    def test_directory(self):
+
+        # Generate data
+        elections = [
+            (STV, [{"count": 2, "ballot": ["A", "B"]}, {"count": 1, "ballot": ["B"]}], {"required_winners": 1, "decimal_places": 3}),
+            (SchulzeSTV, self.ballots, {"required_winners": 2, "ballot_notation": SchulzeSTV.BALLOT_NOTATION_RANKING}),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            expected = [ResultCache(directory=directory).run(system, ballots, **options) for system, ballots, options in elections]
+            cache = ResultCache(directory=directory)
+            output = [cache.run(system, list(reversed(ballots)), **options) for system, ballots, options in elections]
+            with open(os.path.join(directory, os.listdir(directory)[0]), encoding="utf-8") as f:
+                stored = json.load(f)
+
+        # Run tests
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(output, expected)
+        self.assertIsInstance(output[0]["rounds"][0]["tallies"]["A"], Decimal)
+        self.assertIn("dict", stored)
+
+    def test_versioned_keys(self):
+
+        # Generate data
+        key = ResultCache.key(STV, self.ballots, {})
+        original = result_cache.CACHE_VERSION
+        result_cache.CACHE_VERSION = original + "-next"
+        try:
+            upgraded = ResultCache.key(STV, self.ballots, {})
+        finally:
+            result_cache.CACHE_VERSION = original
+
+        # Run tests
+        self.assertNotEqual(key, upgraded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from py3votecore.schulze_method import SchulzeMethod
+from copy import deepcopy
 import unittest
 
 
@@ -112,5 +113,42 @@ class TestCondorcet(unittest.TestCase):
             "winner": 'Andrea'
         })
 
+    def test_identical_ballots_aggregated(self):
+
+        # Generate data
+        input = [
+            {"count": 12, "ballot": {"Andrea": 10, "Brad": 5, "Carter": 3}},
+            {"count": 26, "ballot": {"Andrea": 10, "Carter": 5, "Brad": 3}},
+            {"count": 12, "ballot": {"Andrea": 9, "Carter": 4, "Brad": 1}},
+            {"count": 13, "ballot": {"Carter": 10, "Andrea": 5, "Brad": 3}},
+            {"ballot": {"Brad": 10}},
+        ] + [{"ballot": {"Brad": 1}}] * 26
+        schulze = SchulzeMethod(input, ballot_notation=SchulzeMethod.BALLOT_NOTATION_RATING)
+
+        # Run tests
+        self.assertEqual(len(schulze.ballots), 4)
+        self.assertEqual(schulze.as_dict()["pairs"], {
+            ('Andrea', 'Brad'): 63,
+            ('Brad', 'Carter'): 39,
+            ('Carter', 'Andrea'): 13,
+            ('Andrea', 'Carter'): 50,
+            ('Brad', 'Andrea'): 27,
+            ('Carter', 'Brad'): 51
+        })
+
+    def test_input_unchanged(self):
+
+        # Generate data
+        input = [
+            {"count": 12, "ballot": {"Andrea": 1, "Brad": 2, "Carter": 3}},
+            {"count": 26, "ballot": {"Andrea": 1, "Carter": 2, "Brad": 3}},
+            {"ballot": {"Brad": 1}}
+        ]
+        original = deepcopy(input)
+        SchulzeMethod(input, ballot_notation=SchulzeMethod.BALLOT_NOTATION_RANKING)
+
+        # Run tests
+        self.assertEqual(input, original)
+
 if __name__ == "__main__":
     unittest.main()
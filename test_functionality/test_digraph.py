@@ -0,0 +1,78 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.digraph import Digraph
+import unittest
+
+
+class TestDigraph(unittest.TestCase):
+
+    def test_nodes_and_edges(self):
+
+        # Generate data
+        graph = Digraph(["a", "b", "c"], {("a", "b"): 3, ("b", "c"): 2, ("c", "a"): 1})
+        graph.add_node("d")
+        graph.add_edge(("d", "a"), 5)
+        graph.del_edge(("b", "c"))
+        graph.set_edge_weight(("a", "b"), 4)
+
+        # Run tests
+        self.assertEqual(graph.nodes(), ["a", "b", "c", "d"])
+        self.assertEqual(graph.edges(), [("a", "b"), ("c", "a"), ("d", "a")])
+        self.assertEqual(graph.edge_weights(), {("a", "b"): 4, ("c", "a"): 1, ("d", "a"): 5})
+        self.assertEqual(graph.incidents("a"), ["c", "d"])
+        self.assertTrue(graph.has_edge(("d", "a")))
+        self.assertFalse(graph.has_edge(("b", "c")))
+        self.assertRaises(Exception, graph.add_node, "a")
+        self.assertRaises(Exception, graph.add_edge, ("a", "b"))
+        self.assertRaises(Exception, graph.add_edge, ("a", "e"))
+
+        # Deleting a node takes its edges with it
+        graph.del_node("a")
+        self.assertEqual(graph.nodes(), ["b", "c", "d"])
+        self.assertEqual(graph.edges(), [])
+        self.assertFalse("a" in graph)
+
+    def test_accessibility(self):
+
+        # Generate data
+        graph = Digraph(["a", "b", "c", "d", "e"])
+        for edge in [("a", "b"), ("b", "a"), ("b", "c"), ("c", "d"), ("d", "c")]:
+            graph.add_edge(edge)
+        access = graph.accessibility()
+        mutual_access = graph.mutual_accessibility()
+
+        # Run tests
+        self.assertEqual(set(access["a"]), set(["a", "b", "c", "d"]))
+        self.assertEqual(set(access["c"]), set(["c", "d"]))
+        self.assertEqual(access["e"], ["e"])
+        self.assertEqual(set(mutual_access["b"]), set(["a", "b"]))
+        self.assertEqual(set(mutual_access["d"]), set(["c", "d"]))
+        self.assertEqual(mutual_access["e"], ["e"])
+        self.assertEqual(graph.dominated_nodes(), set(["c", "d"]))
+
+    def test_find_cycle(self):
+
+        # Generate data
+        graph = Digraph(["a", "b", "c", "d"], {("a", "b"): 1, ("b", "c"): 1, ("a", "c"): 1})
+
+        # Run tests
+        self.assertEqual(graph.find_cycle(), [])
+        graph.add_edge(("c", "d"))
+        graph.add_edge(("d", "b"))
+        self.assertEqual(graph.find_cycle(), ["b", "c", "d"])
+
+if __name__ == "__main__":
+    unittest.main()
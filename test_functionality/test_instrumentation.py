@@ -0,0 +1,105 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.instrumentation import instrumented
+from py3votecore.plurality import Plurality
+from py3votecore.irv import IRV
+from py3votecore.schulze_stv import SchulzeSTV
+from py3votecore.stv import STV
+import unittest
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.input = [
+            {"count": 60, "ballot": [["a"], ["b"], ["c"], ["d"]]},
+            {"count": 45, "ballot": [["a"], ["c"], ["d"], ["b"]]},
+            {"count": 30, "ballot": [["b"], ["d"], ["a"], ["c"]]},
+            {"count": 15, "ballot": [["c"], ["a"], ["b"], ["d"]]},
+            {"count": 12, "ballot": [["d"], ["b"], ["c"], ["a"]]},
+        ]
+
+    def test_disabled(self):
+
+        # Generate data
+        output = SchulzeSTV(self.input, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING)
+
+        # Run tests
+        self.assertFalse(hasattr(output, "timings"))
+        self.assertNotIn("timings", output.as_dict())
+
+    def test_enabled(self):
+
+        # Generate data
+        calls = []
+        with instrumented(hook=lambda system, timings: calls.append((system, timings))):
+            output = SchulzeSTV(self.input, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING)
+        after = SchulzeSTV(self.input, required_winners=2, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING)
+
+        # Run tests
+        self.assertEqual(calls, [(output, output.timings)])
+        self.assertEqual(output.as_dict()["timings"], output.timings)
+        self.assertEqual(output.winners, after.winners)
+        self.assertFalse(hasattr(after, "timings"))
+        seconds, counters = output.timings["seconds"], output.timings["counters"]
+        for phase in ("total", "standardize_ballots", "proportional_completion", "vote_management", "schwartz_set_heuristic"):
+            self.assertIn(phase, seconds)
+            self.assertGreaterEqual(seconds["total"], seconds[phase])
+        self.assertEqual(counters["vote_managements"], 12)
+        self.assertEqual(counters["vote_management_subsets"], 12 * 3)
+
+    def test_nested_systems(self):
+
+        # Generate data
+        systems = []
+        with instrumented(hook=lambda system, timings: systems.append(system)):
+            output = Plurality([{"count": 3, "ballot": "a"}, {"count": 2, "ballot": "b"}])
+            irv = IRV([
+                {"count": 4, "ballot": ["a", "b"]},
+                {"count": 3, "ballot": ["b", "a"]},
+                {"count": 2, "ballot": ["c", "b"]},
+            ])
+
+        # Run tests
+        self.assertEqual(output.winner, "a")
+        self.assertIn("total", output.as_dict()["timings"]["seconds"])
+        self.assertIn("standardize_ballots", output.multiple_winner_instance.timings["seconds"])
+        self.assertIn("standardize_ballots", output.timings["seconds"])
+        self.assertEqual(systems, [output, irv])
+        self.assertEqual(len(irv.rounds), 2)
+        self.assertEqual(irv.timings["counters"], {"stv_rounds": 2, "stv_transfers": 3})
+        self.assertEqual(irv.timings["counters"], irv.multiple_winner_instance.timings["counters"])
+
+    def test_counters(self):
+
+        # Generate data
+        input = [
+            {"count": 4, "ballot": ["orange"]},
+            {"count": 2, "ballot": ["pear", "orange"]},
+            {"count": 8, "ballot": ["chocolate", "strawberry"]},
+            {"count": 4, "ballot": ["chocolate", "sweets"]},
+            {"count": 1, "ballot": ["strawberry"]},
+            {"count": 1, "ballot": ["sweets"]}
+        ]
+        with instrumented():
+            output = STV(input, required_winners=3)
+
+        # Run tests
+        self.assertEqual(output.timings["counters"]["stv_rounds"], len(output.rounds))
+        self.assertGreater(output.timings["counters"]["stv_transfers"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
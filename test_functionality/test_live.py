@@ -0,0 +1,132 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.live import CondorcetTally, PluralityTally, BordaTally
+from py3votecore.plurality_at_large import PluralityAtLarge
+from py3votecore.borda_at_large import BordaAtLarge
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.ranked_pairs import RankedPairs
+from py3votecore.ballot_profile import BALLOT_NOTATION_GROUPING
+import random
+import unittest
+
+
+class TestCondorcetTally(unittest.TestCase):
+
+    def test_matches_full_count(self):
+
+        # Generate data
+        random.seed(21)
+        tie_breaker = list("ABCDEFG")
+        tally = CondorcetTally()
+        counted = []
+        for step in range(300):
+            if counted and random.random() < 0.3:
+                ballot = counted.pop(random.randrange(len(counted)))
+                tally.remove(ballot["ballot"], ballot["count"])
+            else:
+                candidates = random.sample(tie_breaker, random.randint(1, min(7, 3 + step // 50)))
+                ballot = {"count": random.randint(1, 4), "ballot": dict((candidate, random.randint(1, 5)) for candidate in candidates)}
+                tally.add(ballot["ballot"], ballot["count"])
+                counted.append(ballot)
+
+            # Run tests
+            if step % 10 == 0 and counted:
+                self.assertEqual(tally.schulze_method(tie_breaker).as_dict(), SchulzeMethod(counted, tie_breaker).as_dict())
+                self.assertEqual(tally.ranked_pairs(tie_breaker).as_dict(), RankedPairs(counted, tie_breaker).as_dict())
+
+    def test_withdrawn_candidates(self):
+
+        # Generate data
+        tally = CondorcetTally(BALLOT_NOTATION_GROUPING)
+        tally.add([["A"], ["B"]], 3)
+        tally.add([["C"], ["A"]], 2)
+        tally.remove([["C"], ["A"]], 2)
+
+        # Run tests
+        self.assertEqual(tally.pairs(), {("A", "B"): 3, ("B", "A"): 0})
+        self.assertEqual(tally.schulze_method().winner, "A")
+        self.assertRaises(Exception, tally.remove, [["C"], ["A"]])
+        tally.remove([["A"], ["B"]], 3)
+        self.assertRaises(Exception, tally.schulze_method)
+
+    def test_single_candidate(self):
+
+        # Generate data
+        tally = CondorcetTally(BALLOT_NOTATION_GROUPING)
+        tally.add([["A"]])
+
+        # Run tests
+        self.assertEqual(tally.ranked_pairs().as_dict(), RankedPairs([{"count": 1, "ballot": [["A"]]}], ballot_notation=BALLOT_NOTATION_GROUPING).as_dict())
+
+
+class TestLeaderboards(unittest.TestCase):
+
+    def random_count(self, tally_class, system, required_winners, ballot_lengths):
+
+        # Generate data
+        random.seed(22)
+        tie_breaker = list("ABCDEFGH")
+        tally = tally_class(required_winners=required_winners, tie_breaker=tie_breaker)
+        counted = []
+        ties = 0
+        for step in range(400):
+            if counted and random.random() < 0.3:
+                ballot = counted.pop(random.randrange(len(counted)))
+                tally.remove(ballot["ballot"], ballot["count"])
+            else:
+                ballot = {"count": random.randint(1, 3), "ballot": random.sample(tie_breaker[:random.randint(4, 8)], random.randint(*ballot_lengths))}
+                tally.add(ballot["ballot"], ballot["count"])
+                counted.append(ballot)
+
+            # Run tests
+            if len(set(candidate for ballot in counted for candidate in ballot["ballot"])) < required_winners:
+                self.assertRaises(Exception, tally.as_dict)
+            else:
+                expected = system([dict(ballot) for ballot in counted], tie_breaker=tie_breaker, required_winners=required_winners).as_dict()
+                self.assertEqual(tally.as_dict(), expected)
+                self.assertEqual(tally.winners, expected["winners"])
+                ties += "tie_breaker" in expected
+        self.assertTrue(ties)
+
+    def test_plurality(self):
+        self.random_count(PluralityTally, PluralityAtLarge, 2, (1, 2))
+
+    def test_borda(self):
+        self.random_count(BordaTally, BordaAtLarge, 3, (3, 4))
+
+    def test_leaders(self):
+
+        # Generate data
+        tally = PluralityTally()
+        tally.add("A", 5)
+        tally.add("B", 3)
+        tally.add("C", 3)
+        tally.add("D")
+
+        # Run tests
+        self.assertEqual(tally.leaders(2), [(5, set(["A"])), (3, set(["B", "C"]))])
+        self.assertEqual(tally.winners, set(["A"]))
+        tally.add("C", 3)
+        self.assertEqual(tally.winners, set(["C"]))
+        tally.remove("C", 3)
+        tally.remove("A", 5)
+        self.assertEqual(tally.tied_winners, set(["B", "C"]))
+        self.assertRaises(Exception, tally.remove, "A")
+        self.assertRaises(Exception, tally.add, ["A", "B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -129,6 +129,33 @@ class TestSchulzeMethod(unittest.TestCase):
             'winner': 'E'
         })
 
+    # http://en.wikipedia.org/wiki/Schulze_method#Example
+    def test_strongest_paths(self):
+
+        # Generate data
+        input = [
+            {"count": 5, "ballot": [["A"], ["C"], ["B"], ["E"], ["D"]]},
+            {"count": 5, "ballot": [["A"], ["D"], ["E"], ["C"], ["B"]]},
+            {"count": 8, "ballot": [["B"], ["E"], ["D"], ["A"], ["C"]]},
+            {"count": 3, "ballot": [["C"], ["A"], ["B"], ["E"], ["D"]]},
+            {"count": 7, "ballot": [["C"], ["A"], ["E"], ["B"], ["D"]]},
+            {"count": 2, "ballot": [["C"], ["B"], ["A"], ["D"], ["E"]]},
+            {"count": 7, "ballot": [["D"], ["C"], ["E"], ["B"], ["A"]]},
+            {"count": 8, "ballot": [["E"], ["B"], ["A"], ["D"], ["C"]]}
+        ]
+        output = SchulzeMethod(input, ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING)
+
+        # Run tests
+        self.assertEqual(output.winner, 'E')
+        self.assertEqual(output.ranking, [set(['E']), set(['A']), set(['C']), set(['B']), set(['D'])])
+        self.assertEqual(output.strongest_paths, {
+            ('A', 'B'): 28, ('A', 'C'): 28, ('A', 'D'): 30, ('A', 'E'): 24,
+            ('B', 'A'): 25, ('B', 'C'): 28, ('B', 'D'): 33, ('B', 'E'): 24,
+            ('C', 'A'): 25, ('C', 'B'): 29, ('C', 'D'): 29, ('C', 'E'): 24,
+            ('D', 'A'): 25, ('D', 'B'): 28, ('D', 'C'): 28, ('D', 'E'): 24,
+            ('E', 'A'): 25, ('E', 'B'): 28, ('E', 'C'): 28, ('E', 'D'): 31,
+        })
+
     def test_tiebreaker_bug(self):
 
         # Generate data
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from py3votecore.schulze_npr import SchulzeNPR
+from copy import deepcopy
 import unittest
 
 
@@ -62,6 +63,40 @@ class TestSchulzeNPR(unittest.TestCase):
             ]
         })
 
+    def test_tied_rounds(self):
+
+        # Generate data
+        input = [
+            {"count": 1, "ballot": {"A": 1, "B": 2, "C": 3}},
+            {"count": 1, "ballot": {"A": 2, "B": 1, "C": 3}},
+        ]
+        output = SchulzeNPR(input, tie_breaker=['B', 'A', 'C'], ballot_notation=SchulzeNPR.BALLOT_NOTATION_RANKING).as_dict()
+
+        # Run tests
+        self.assertEqual(output, {
+            'order': ['B', 'A', 'C'],
+            'candidates': set(['A', 'B', 'C']),
+            'tie_breaker': ['B', 'A', 'C'],
+            'rounds': [
+                {'winner': 'B', 'tied_winners': set(['A', 'B'])},
+                {'winner': 'A'},
+                {'winner': 'C'}
+            ]
+        })
+
+    def test_input_unchanged(self):
+
+        # Generate data
+        input = [
+            {"count": 2, "ballot": {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5}},
+            {"count": 1, "ballot": {"A": 5, "B": 4, "C": 3}},
+        ]
+        original = deepcopy(input)
+        SchulzeNPR(input, ballot_notation=SchulzeNPR.BALLOT_NOTATION_RANKING)
+
+        # Run tests
+        self.assertEqual(input, original)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from py3votecore.schulze_pr import SchulzePR
+from concurrent.futures import ThreadPoolExecutor
 import unittest
 
 
@@ -102,5 +103,24 @@ class TestSchulzePR(unittest.TestCase):
             ],
         })
 
+    def test_executor(self):
+
+        # Generate data
+        input = [
+            {"count": 6, "ballot": [["a"], ["d"], ["b"], ["c"], ["e"]]},
+            {"count": 72, "ballot": [["a"], ["d"], ["e"], ["b"], ["c"]]},
+            {"count": 30, "ballot": [["b"], ["d"], ["c"], ["e"], ["a"]]},
+            {"count": 48, "ballot": [["b"], ["e"], ["a"], ["d"], ["c"]]},
+            {"count": 168, "ballot": [["c"], ["a"], ["e"], ["b"], ["d"]]},
+            {"count": 108, "ballot": [["d"], ["b"], ["e"], ["c"], ["a"]]},
+            {"count": 30, "ballot": [["e"], ["a"], ["b"], ["d"], ["c"]]},
+        ]
+        output = SchulzePR(input, tie_breaker=["a", "b", "c", "d", "e"], ballot_notation=SchulzePR.BALLOT_NOTATION_GROUPING).as_dict()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            threaded = SchulzePR(input, tie_breaker=["a", "b", "c", "d", "e"], ballot_notation=SchulzePR.BALLOT_NOTATION_GROUPING, executor=executor).as_dict()
+
+        # Run tests
+        self.assertEqual(threaded, output)
+
 if __name__ == "__main__":
     unittest.main()
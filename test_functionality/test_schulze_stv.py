@@ -14,7 +14,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from py3votecore.schulze_stv import SchulzeSTV
-from py3votecore.schulze_helper import SchulzeHelper
+from py3votecore.schulze_helper import SchulzeHelper, pattern_table, PREFERRED_LESS
+from py3votecore.common_functions import unique_permutations
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import random
 import unittest
 
 
@@ -683,5 +687,144 @@ class TestSchulzeSTV(unittest.TestCase):
             [(tuple(int(r) for r in line.split()[1:]), float(line.split()[0]))
              for line in expected.splitlines()])
 
+    def test_strength_of_vote_management(self):
+
+        # Generate data
+        random.seed(5)
+        candidates = ["a", "b", "c", "d", "e"]
+        helper = SchulzeHelper()
+        helper.required_winners = 3
+        helper.standardize_ballots([
+            {"count": random.randint(1, 20), "ballot": dict((candidate, random.randint(1, 4)) for candidate in candidates)}
+            for i in range(30)
+        ], helper.BALLOT_NOTATION_RANKING)
+        helper.generate_completed_patterns()
+
+        # Run tests
+        for candidate in candidates:
+            other_candidates = [other_candidate for other_candidate in candidates if other_candidate != candidate][:3]
+            completed = helper.proportional_completion(candidate, other_candidates)
+            self.assertAlmostEqual(
+                helper.strength_of_vote_management(completed),
+                min(
+                    sum(weight for pattern, weight in completed.items() if any(pattern[i] == PREFERRED_LESS for i in slots)) / len(slots)
+                    for size in range(1, 4)
+                    for slots in itertools.combinations(range(3), size)
+                ),
+                places=8,
+            )
+
+    def test_pattern_table(self):
+
+        # Generate data
+        table = pattern_table(4)
+
+        # Run tests
+        self.assertIs(pattern_table(4), table)
+        self.assertEqual(list(table.patterns), [
+            tuple(pattern)
+            for i in range(5)
+            for pattern in unique_permutations([1] * (4 - i) + [3] * i)
+        ])
+        self.assertEqual(table.masks.tolist()[:2], [15, 7])
+
+    def test_pattern_tallies(self):
+
+        # Generate data
+        helper = SchulzeHelper()
+        helper.standardize_ballots([
+            {"count": 2, "ballot": {"a": 1, "b": 2, "c": 3}},
+            {"count": 3, "ballot": {"a": 2, "b": 2, "c": 1}},
+            {"count": 4, "ballot": {"a": 1, "b": 3, "c": 2}},
+            {"count": 5, "ballot": {"b": 1}},
+        ], helper.BALLOT_NOTATION_RANKING)
+
+        # Run tests
+        self.assertEqual(list(helper.pattern_tallies("a", ["b", "c"])), [
+            ((3, 3), 6),
+            ((2, 1), 3),
+            ((1, 2), 5),
+        ])
+
+    def test_pruned(self):
+
+        # Generate data
+        random.seed(11)
+        candidates = ["a", "b", "c", "d", "e", "f"]
+        for required_winners in range(1, 6):
+            input = []
+            for i in range(20):
+                ballot = candidates[:]
+                random.shuffle(ballot)
+                input.append({"count": random.randint(1, 9), "ballot": [[candidate] for candidate in ballot[:random.randint(2, 6)]]})
+            output = SchulzeSTV(input, required_winners=required_winners, tie_breaker=candidates, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING).as_dict()
+            pruned = SchulzeSTV(input, required_winners=required_winners, tie_breaker=candidates, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING, pruned=True).as_dict()
+
+            # Run tests
+            if "actions" not in pruned:
+                del output["actions"]
+            self.assertEqual(pruned, output)
+
+    def test_dominated_nodes(self):
+
+        # Generate data
+        edges = [("a", "b"), ("b", "a"), ("b", "c"), ("c", "d"), ("d", "c"), ("e", "d")]
+
+        # Run tests
+        self.assertEqual(SchulzeHelper.dominated_nodes(edges), set(["c", "d"]))
+        self.assertEqual(SchulzeHelper.dominated_nodes([]), set())
+
+    def test_executor(self):
+
+        # Generate data
+        input = [
+            {"count": 60, "ballot": [["a"], ["b"], ["c"], ["d"], ["e"]]},
+            {"count": 45, "ballot": [["a"], ["c"], ["e"], ["b"], ["d"]]},
+            {"count": 30, "ballot": [["a"], ["d"], ["b"], ["e"], ["c"]]},
+            {"count": 48, "ballot": [["b"], ["c"], ["d"], ["e"], ["a"]]},
+            {"count": 39, "ballot": [["b"], ["d"], ["a"], ["c"], ["e"]]},
+            {"count": 51, "ballot": [["c"], ["d"], ["e"], ["a"], ["b"]]},
+            {"count": 42, "ballot": [["d"], ["a"], ["c"], ["e"], ["b"]]},
+            {"count": 54, "ballot": [["d"], ["e"], ["a"], ["b"], ["c"]]},
+            {"count": 57, "ballot": [["e"], ["a"], ["b"], ["c"], ["d"]]},
+        ]
+        output = SchulzeSTV(input, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING).as_dict()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            threaded = SchulzeSTV(input, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING, executor=executor).as_dict()
+        processes = SchulzeSTV(input, required_winners=3, ballot_notation=SchulzeSTV.BALLOT_NOTATION_GROUPING, executor=2).as_dict()
+
+        # Run tests
+        self.assertEqual(threaded, output)
+        self.assertEqual(processes, output)
+
+    def test_executor_chunks(self):
+
+        # Generate data
+        class CountingExecutor(ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, *args, **kwargs):
+                CountingExecutor.submitted += 1
+                return super(CountingExecutor, self).submit(*args, **kwargs)
+
+        helper = SchulzeHelper()
+        helper.required_winners = 3
+        helper.standardize_ballots([
+            {"count": 60, "ballot": [["a"], ["b"], ["c"], ["d"], ["e"]]},
+            {"count": 45, "ballot": [["e"], ["c"], ["a"], ["b"], ["d"]]},
+        ], helper.BALLOT_NOTATION_GROUPING)
+        helper.generate_completed_patterns()
+        tasks = [
+            (candidate, sorted(set(candidate_set) - set([candidate])))
+            for candidate_set in itertools.combinations(sorted(helper.candidates), 4)
+            for candidate in candidate_set
+        ]
+        with CountingExecutor(max_workers=1) as executor:
+            output = helper.vote_management_strengths(tasks, executor)
+
+        # Run tests
+        self.assertEqual(output, helper.vote_management_strengths(tasks))
+        self.assertEqual(CountingExecutor.submitted, 4)
+
 if __name__ == "__main__":
     unittest.main()
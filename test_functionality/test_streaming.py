@@ -0,0 +1,85 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from py3votecore.streaming import BallotStream, read_csv, read_jsonl
+from py3votecore.schulze_method import SchulzeMethod
+from py3votecore.schulze_by_graph import SchulzeMethodByGraph
+from py3votecore.borda_at_large import BordaAtLarge
+from py3votecore.stv import STV
+import unittest
+import io
+
+
+class TestBallotStream(unittest.TestCase):
+
+    def setUp(self):
+        self.input = [
+            {"count": 5, "ballot": ["A", "C", "B", "E", "D"]},
+            {"count": 5, "ballot": ["A", "D", "E", "C", "B"]},
+            {"count": 8, "ballot": ["B", "E", "D", "A", "C"]},
+            {"count": 3, "ballot": ["C", "A", "B", "E", "D"]},
+            {"count": 7, "ballot": ["C", "A", "E", "B", "D"]},
+            {"count": 2, "ballot": ["C", "B", "A", "D", "E"]},
+            {"count": 7, "ballot": ["D", "C", "E", "B", "A"]},
+            {"count": 8, "ballot": ["E", "B", "A", "D", "C"]}
+        ]
+        self.voters = [{"ballot": list(ballot["ballot"])} for ballot in self.input for i in range(ballot["count"])]
+
+    def test_sufficient_statistics(self):
+
+        # Generate data
+        stream = BallotStream(chunk_size=7).consume(iter(self.voters))
+        schulze = SchulzeMethod([
+            {"count": ballot["count"], "ballot": [[candidate] for candidate in ballot["ballot"]]}
+            for ballot in self.input
+        ], ballot_notation=SchulzeMethod.BALLOT_NOTATION_GROUPING)
+
+        # Run tests
+        self.assertEqual(stream.voters, 45)
+        self.assertEqual(stream.first_preferences(), {"A": 10, "B": 8, "C": 12, "D": 7, "E": 8})
+        self.assertEqual(stream.borda_scores(), BordaAtLarge(self.input).tallies)
+        self.assertEqual(stream.pairs(), schulze.pairs)
+        self.assertEqual(SchulzeMethodByGraph(stream.pairs()).winner, "E")
+        self.assertEqual(len(stream.profile()), len(self.input))
+        self.assertEqual(STV(stream.profile(), required_winners=2).as_dict(), STV(self.input, required_winners=2).as_dict())
+
+    def test_late_candidates(self):
+
+        # Generate data
+        input = [
+            {"count": 3, "ballot": {"A": 2, "B": 1}},
+            {"count": 2, "ballot": {"B": 2}},
+            {"count": 4, "ballot": {"C": 3, "A": 1}},
+            {"count": 1, "ballot": {"D": 1}},
+        ]
+        stream = BallotStream(SchulzeMethod.BALLOT_NOTATION_RATING, chunk_size=1).consume(input)
+
+        # Run tests
+        self.assertEqual(stream.pairs(), SchulzeMethod(input, ballot_notation=SchulzeMethod.BALLOT_NOTATION_RATING).pairs)
+
+    def test_readers(self):
+
+        # Generate data
+        jsonl = io.StringIO('{"count": 2, "ballot": ["A", "B"]}\n\n["B", "A"]\n')
+        counted = io.StringIO("2,A,B\n1,B,A,\n")
+        plain = io.StringIO("A,B\nA,B\nB,A\n")
+
+        # Run tests
+        self.assertEqual(list(read_jsonl(jsonl)), [{"count": 2, "ballot": ["A", "B"]}, {"ballot": ["B", "A"]}])
+        self.assertEqual(list(read_csv(counted, counted=True)), [{"count": 2, "ballot": ["A", "B"]}, {"count": 1, "ballot": ["B", "A"]}])
+        self.assertEqual(BallotStream().consume(read_csv(plain)).pairs(), {("A", "B"): 2, ("B", "A"): 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from py3votecore.stv import STV
+from copy import deepcopy
+from decimal import Decimal
+import random
 import unittest
 
 
@@ -197,6 +200,142 @@ class TestSTV(unittest.TestCase):
         # Run tests
         self.assertEqual(output["winners"], set(["A", "B", "C"]))
 
+    # STV, identical ballots are merged before counting
+    def test_stv_identical_ballots(self):
+
+        # Generate data
+        input = [
+            {"count": 4, "ballot": ["orange"]},
+            {"count": 2, "ballot": ["pear", "orange"]},
+            {"count": 8, "ballot": ["chocolate", "strawberry"]},
+            {"count": 4, "ballot": ["chocolate", "sweets"]},
+            {"count": 1, "ballot": ["strawberry"]},
+            {"count": 1, "ballot": ["sweets"]}
+        ]
+        expanded = [{"ballot": list(ballot["ballot"])} for ballot in input for i in range(ballot["count"])]
+        stv = STV(expanded, required_winners=3)
+
+        # Run tests
+        self.assertEqual(len(stv.ballots), len(input))
+        self.assertEqual(stv.as_dict(), STV(input, required_winners=3).as_dict())
+
+    # STV, the caller's ballots are left as they were
+    def test_stv_input_unchanged(self):
+
+        # Generate data
+        input = [
+            {"count": 4, "ballot": ["orange"]},
+            {"count": 2, "ballot": ["pear", "orange"]},
+            {"count": 8, "ballot": ["chocolate", "strawberry"]},
+            {"ballot": ["chocolate", "sweets"]},
+        ]
+        original = deepcopy(input)
+        STV(input, required_winners=2)
+
+        # Run tests
+        self.assertEqual(input, original)
+
+    # STV, transferred fractions add up as in a full re-tally, leaving B and C
+    # exactly tied rather than B a rounding error behind
+    def test_stv_transfer_rounding(self):
+
+        # Generate data
+        input = [
+            {"count": 5, "ballot": ["D", "E"]},
+            {"count": 3, "ballot": ["F", "D", "A", "E", "B"]},
+            {"count": 1, "ballot": ["B", "A", "E", "D"]},
+            {"count": 3, "ballot": ["C", "D", "A", "E", "B"]},
+            {"count": 1, "ballot": ["D", "F", "B", "A", "E", "C"]},
+            {"count": 5, "ballot": ["A"]},
+            {"count": 2, "ballot": ["C", "B", "E"]},
+            {"count": 5, "ballot": ["B", "E"]},
+            {"count": 1, "ballot": ["C", "F"]},
+            {"count": 1, "ballot": ["D", "B", "E", "C"]},
+            {"count": 5, "ballot": ["A", "C", "D", "E", "B"]}
+        ]
+        output = STV(input, required_winners=3, tie_breaker=["A", "B", "C", "D", "E", "F"]).as_dict()
+
+        # Run tests
+        self.assertAlmostEqual(output["rounds"][-1]["tallies"]["B"], 6.5)
+        self.assertAlmostEqual(output["rounds"][-1]["tallies"]["C"], 6.5)
+        self.assertEqual(output["rounds"][-1]["tied_losers"], set(['B', 'C']))
+        self.assertEqual(output["rounds"][-1]["loser"], 'C')
+        self.assertEqual(output["winners"], set(['A', 'B', 'D']))
+
+    # STV, identical ballots merged before counting keep the baseline tie
+    def test_stv_aggregated_transfer_tie(self):
+
+        # Generate data
+        input = [
+            {"count": 1, "ballot": ["a", "b", "c"]},
+            {"count": 2, "ballot": ["b"]},
+            {"count": 1, "ballot": ["c"]},
+            {"count": 1, "ballot": ["a", "c"]},
+            {"count": 4, "ballot": ["c", "b"]},
+            {"count": 3, "ballot": ["b"]},
+            {"count": 1, "ballot": ["a"]},
+            {"count": 4, "ballot": ["a"]}
+        ]
+        output = STV(input, required_winners=2, tie_breaker=["c", "b", "a"]).as_dict()
+
+        # Run tests
+        self.assertEqual(output["quota"], 6)
+        self.assertEqual(output["rounds"][0], {
+            'tallies': {'a': 7.0, 'b': 5.0, 'c': 5.0},
+            'winners': set(['a'])
+        })
+        self.assertAlmostEqual(output["rounds"][1]["tallies"]["b"], 5 + 1 / 7.0)
+        self.assertAlmostEqual(output["rounds"][1]["tallies"]["c"], 5 + 1 / 7.0)
+        self.assertEqual(output["rounds"][1]["tied_losers"], set(['b', 'c']))
+        self.assertEqual(output["rounds"][1]["loser"], 'b')
+        self.assertEqual(output["winners"], set(['a', 'c']))
+
+    # STV, surpluses transferred as truncated fixed-point weights
+    def test_stv_decimal_places(self):
+
+        # Generate data
+        input = [
+            {"count": 4, "ballot": ["A", "B"]},
+            {"count": 3, "ballot": ["A", "C"]},
+            {"count": 3, "ballot": ["C"]},
+            {"count": 2, "ballot": ["D"]}
+        ]
+        output = STV(input, required_winners=2, decimal_places=2).as_dict()
+
+        # Run tests
+        self.assertEqual(output, {
+            'candidates': set(['A', 'B', 'C', 'D']),
+            'quota': 5,
+            'rounds': [
+                {'tallies': {'A': 7, 'B': 0, 'C': 3, 'D': 2}, 'winners': set(['A'])},
+                {'tallies': {'B': Decimal('1.14'), 'C': Decimal('3.85'), 'D': 2}, 'loser': 'B'},
+                {'tallies': {'C': Decimal('3.85'), 'D': 2}, 'loser': 'D'}
+            ],
+            'remaining_candidates': set(['C']),
+            'winners': set(['A', 'C'])
+        })
+        self.assertEqual(str(output["rounds"][0]["tallies"]["A"]), "7.00")
+
+    # STV, fixed-point counts reach the same winners as floating point ones
+    def test_stv_decimal_places_agree(self):
+
+        # Generate data
+        random.seed(25)
+        candidates = ["a", "b", "c", "d", "e", "f"]
+        for i in range(20):
+            input = []
+            for j in range(15):
+                ballot = candidates[:]
+                random.shuffle(ballot)
+                input.append({"count": random.randint(1, 20), "ballot": ballot[:random.randint(1, 6)]})
+            floating = STV(input, required_winners=3, tie_breaker=candidates).as_dict()
+            fixed = STV(input, required_winners=3, tie_breaker=candidates, decimal_places=9).as_dict()
+
+            # Run tests
+            self.assertEqual(fixed["winners"], floating["winners"])
+            for fixed_round, floating_round in zip(fixed["rounds"], floating["rounds"]):
+                for candidate, tally in fixed_round["tallies"].items():
+                    self.assertAlmostEqual(float(tally), floating_round["tallies"][candidate], places=6)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+# Copyright (C) 2009, Brad Beattie
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from benchmarks.generators import MODELS, candidate_names
+from benchmarks.run import IMPORT_BUDGETS, QUICK_GRID, compare, import_times, over_budget, report, run_suite
+import json
+import subprocess
+import sys
+import unittest
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_generators(self):
+
+        # Generate data
+        profiles = dict((name, model(5, 40, seed=1)) for name, model in MODELS.items())
+
+        # Run tests
+        for name, ballots in profiles.items():
+            self.assertEqual(len(ballots), 40)
+            for ballot in ballots:
+                self.assertEqual(sorted(ballot["ballot"]), candidate_names(5))
+            self.assertEqual(ballots, MODELS[name](5, 40, seed=1))
+
+    def test_suite(self):
+
+        # Generate data
+        results = run_suite(dict(QUICK_GRID, voters=[20]), systems=["Plurality", "SchulzeMethod", "SchulzeSTV"])
+        data = json.loads(json.dumps(report(results)))
+        slower = [dict(result, seconds=result["seconds"] * 10 + 1) for result in results]
+
+        # Run tests
+        self.assertEqual(len(results), 9)
+        self.assertEqual(compare(results, data), [])
+        self.assertEqual(len(compare(slower, data)), 9)
+
+    def test_import_times(self):
+
+        # Generate data
+        imports = import_times({"py3votecore.plurality": 0.0, "py3votecore": 60.0}, repeat=1)
+
+        # Run tests
+        self.assertEqual([result["module"] for result in imports], ["py3votecore.plurality", "py3votecore"])
+        self.assertEqual(over_budget(imports), imports[:1])
+        self.assertIn("py3votecore.schulze_method", IMPORT_BUDGETS)
+
+    def test_lazy_imports(self):
+
+        # Generate data
+        script = "import sys; import py3votecore.plurality, py3votecore.stv, py3votecore.borda_manipulation_heurestics_methods; print(sorted(set(sys.modules) & set(['numpy', 'networkx'])))"
+        loaded = subprocess.check_output([sys.executable, "-c", script]).decode().strip()
+
+        # Run tests
+        self.assertEqual(loaded, "[]")
+
+if __name__ == "__main__":
+    unittest.main()